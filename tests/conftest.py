@@ -1,64 +1,97 @@
 """Pytest configuration and shared fixtures."""
 
 import pytest
-import tempfile
 import os
 from pathlib import Path
+from types import MappingProxyType
 
 
-@pytest.fixture
-def temp_dir():
-    """Provide a temporary directory for test files."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        yield tmpdir
+# Built once at import; nested sections are read-only as well
+_SAMPLE_CONFIG = MappingProxyType({
+    'save_path': '/tmp/ytp3_test',
+    'mode': 'Video',
+    'format': 'mp4',
+    'resolution': 'Best Available',
+    'quality': 'best',
+    'concurrency': 2,
+    'toggles': MappingProxyType({
+        'meta': True,
+        'thumb': False,
+        'subs': False,
+        'sponsor': False,
+        'geo': False,
+        'force_ffmpeg': False,
+        'archive': False,
+    }),
+    'auth': MappingProxyType({
+        'browser': 'None',
+        'file': '',
+    }),
+    'last_urls': '',
+    'browser_cookies': 'None',
+    'cookie_file': '',
+})
+
+
+def _thaw(mapping):
+    """Recursively copy a read-only mapping into plain dicts."""
+    return {k: _thaw(v) if isinstance(v, MappingProxyType) else v for k, v in mapping.items()}
+
+
+@pytest.fixture(scope="session")
+def temp_dir(tmp_path_factory):
+    """Provide a temporary directory shared by tests that only read from it."""
+    return str(tmp_path_factory.mktemp("ytp3"))
 
 
 @pytest.fixture
+def temp_dir_rw(tmp_path):
+    """Provide a fresh temporary directory for tests that write files."""
+    return str(tmp_path)
+
+
+@pytest.fixture(scope="session")
 def sample_opts():
-    """Provide sample yt-dlp options for testing."""
-    return {
+    """Provide sample yt-dlp options for testing (read-only, shared)."""
+    return MappingProxyType({
         'format': 'bestvideo+bestaudio/best',
         'outtmpl': 'test_%(title)s.%(ext)s',
         'quiet': True,
         'no_warnings': True,
-    }
+    })
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_caps():
-    """Provide sample system capabilities for testing."""
-    return {
+    """Provide sample system capabilities for testing (read-only, shared)."""
+    return MappingProxyType({
         'ffmpeg': True,
         'ffprobe': True,
         'js_runtime': False,
         'internet': True,
-    }
+    })
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_config():
-    """Provide sample configuration dictionary."""
-    return {
-        'save_path': '/tmp/ytp3_test',
-        'mode': 'Video',
-        'format': 'mp4',
-        'resolution': 'Best Available',
-        'quality': 'best',
-        'concurrency': 2,
-        'toggles': {
-            'meta': True,
-            'thumb': False,
-            'subs': False,
-            'sponsor': False,
-            'geo': False,
-            'force_ffmpeg': False,
-            'archive': False,
-        },
-        'auth': {
-            'browser': 'None',
-            'file': '',
-        },
-        'last_urls': '',
-        'browser_cookies': 'None',
-        'cookie_file': '',
-    }
+    """Provide sample configuration dictionary (read-only, shared)."""
+    return _SAMPLE_CONFIG
+
+
+@pytest.fixture
+def sample_config_data():
+    """Provide a mutable, JSON-serializable copy of the sample configuration."""
+    return _thaw(_SAMPLE_CONFIG)
+
+
+@pytest.fixture(scope="session")
+def shared_parser():
+    """Provide the CLI argument parser, built once per session."""
+    from ytp3.cli import setup_parser
+    return setup_parser()
+
+
+@pytest.fixture(scope="session")
+def development_md():
+    """Provide the contents of DEVELOPMENT.md, read once per session."""
+    return (Path(__file__).parent.parent / "DEVELOPMENT.md").read_text(encoding="utf-8")
@@ -1,14 +1,15 @@
 """Tests for CLI interface."""
 
 import pytest
-import sys
-from pathlib import Path
 from io import StringIO
 from unittest.mock import patch, MagicMock
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
+from ytp3 import cli
+from ytp3.cli import setup_parser, parse_args, cli_progress, cli_log
 
-from ytp3.cli import setup_parser, cli_progress, cli_log
+
+URL = 'https://www.youtube.com/watch?v=test123'
+ARGV_URL_ONLY = [URL]
 
 
 class TestCLIParser:
@@ -21,87 +22,91 @@ class TestCLIParser:
         assert parser is not None
         assert hasattr(parser, 'parse_args')
     
-    def test_parser_basic_url_argument(self):
+    def test_parser_is_cached(self):
+        """Test that repeated calls reuse the same parser instance."""
+        assert setup_parser() is setup_parser()
+    
+    def test_parse_args_url_only_matches_parser(self, shared_parser):
+        """Test that the URL-only fast path yields the same values as argparse."""
+        assert vars(parse_args(ARGV_URL_ONLY)) == vars(shared_parser.parse_args(ARGV_URL_ONLY))
+    
+    def test_parse_args_with_flags_uses_parser(self):
+        """Test that flagged invocations are parsed by argparse."""
+        args = parse_args(['-a', '-q', 'low', URL])
+        
+        assert args.audio is True
+        assert args.quality == 'low'
+        assert args.url == URL
+    
+    def test_parser_basic_url_argument(self, shared_parser):
         """Test parsing basic URL argument."""
-        parser = setup_parser()
-        args = parser.parse_args(['https://www.youtube.com/watch?v=test123'])
+        args = shared_parser.parse_args(ARGV_URL_ONLY)
         
-        assert args.url == 'https://www.youtube.com/watch?v=test123'
+        assert args.url == URL
     
-    def test_parser_audio_flag(self):
+    def test_parser_audio_flag(self, shared_parser):
         """Test parsing audio flag."""
-        parser = setup_parser()
-        args = parser.parse_args(['-a', 'https://www.youtube.com/watch?v=test123'])
+        args = shared_parser.parse_args(['-a', URL])
         
         assert args.audio is True
     
-    def test_parser_format_option(self):
+    def test_parser_format_option(self, shared_parser):
         """Test parsing format option."""
-        parser = setup_parser()
-        args = parser.parse_args(['-f', 'mp3', 'https://www.youtube.com/watch?v=test123'])
+        args = shared_parser.parse_args(['-f', 'mp3', URL])
         
         assert args.format == 'mp3'
     
-    def test_parser_quality_option(self):
+    def test_parser_quality_option(self, shared_parser):
         """Test parsing quality option."""
-        parser = setup_parser()
-        args = parser.parse_args(['-q', 'high', 'https://www.youtube.com/watch?v=test123'])
+        args = shared_parser.parse_args(['-q', 'high', URL])
         
         assert args.quality == 'high'
     
-    def test_parser_quality_choices(self):
+    def test_parser_quality_choices(self, shared_parser):
         """Test that quality only accepts valid choices."""
-        parser = setup_parser()
-        
         # Valid quality should parse
-        args = parser.parse_args(['-q', 'best', 'https://www.youtube.com/watch?v=test123'])
+        args = shared_parser.parse_args(['-q', 'best', URL])
         assert args.quality == 'best'
         
-        args = parser.parse_args(['-q', 'medium', 'https://www.youtube.com/watch?v=test123'])
+        args = shared_parser.parse_args(['-q', 'medium', URL])
         assert args.quality == 'medium'
     
-    def test_parser_output_option(self):
+    def test_parser_output_option(self, shared_parser):
         """Test parsing output directory option."""
-        parser = setup_parser()
-        args = parser.parse_args(['-o', '/tmp/downloads', 'https://www.youtube.com/watch?v=test123'])
+        args = shared_parser.parse_args(['-o', '/tmp/downloads', URL])
         
         assert args.output == '/tmp/downloads'
     
-    def test_parser_no_meta_flag(self):
+    def test_parser_no_meta_flag(self, shared_parser):
         """Test parsing no-meta flag."""
-        parser = setup_parser()
-        args = parser.parse_args(['--no-meta', 'https://www.youtube.com/watch?v=test123'])
+        args = shared_parser.parse_args(['--no-meta', URL])
         
         assert args.no_meta is True
     
-    def test_parser_geo_bypass_flag(self):
+    def test_parser_geo_bypass_flag(self, shared_parser):
         """Test parsing geo-bypass flag."""
-        parser = setup_parser()
-        args = parser.parse_args(['--geo', 'https://www.youtube.com/watch?v=test123'])
+        args = shared_parser.parse_args(['--geo', URL])
         
         assert args.geo is True
     
-    def test_parser_cookies_browser_option(self):
+    def test_parser_cookies_browser_option(self, shared_parser):
         """Test parsing cookies-browser option."""
-        parser = setup_parser()
-        args = parser.parse_args(['--cookies-browser', 'chrome', 'https://www.youtube.com/watch?v=test123'])
+        args = shared_parser.parse_args(['--cookies-browser', 'chrome', URL])
         
         assert args.cookies_browser == 'chrome'
     
-    def test_parser_cookies_file_option(self):
+    def test_parser_cookies_file_option(self, shared_parser):
         """Test parsing cookies-file option."""
-        parser = setup_parser()
-        args = parser.parse_args(['--cookies-file', '/path/to/cookies.txt', 'https://www.youtube.com/watch?v=test123'])
+        args = shared_parser.parse_args(['--cookies-file', '/path/to/cookies.txt', URL])
         
         assert args.cookies_file == '/path/to/cookies.txt'
     
-    def test_parser_multiple_options(self):
+    def test_parser_multiple_options(self, shared_parser):
         """Test parsing multiple options together."""
-        parser = setup_parser()
-        args = parser.parse_args([
+        args = shared_parser.parse_args([
             '-a', '-f', 'm4a', '-q', 'medium', 
             '--no-meta', '--geo',
-            'https://www.youtube.com/watch?v=test123'
+            URL
         ])
         
         assert args.audio is True
@@ -109,66 +114,81 @@ class TestCLIParser:
         assert args.quality == 'medium'
         assert args.no_meta is True
         assert args.geo is True
-        assert args.url == 'https://www.youtube.com/watch?v=test123'
+        assert args.url == URL
 
 
 class TestCLIUtilityFunctions:
     """Test CLI utility functions."""
     
+    @pytest.fixture(autouse=True)
+    def _reset_progress_throttle(self, monkeypatch):
+        """Start every test with no previous progress redraw."""
+        monkeypatch.setattr(cli, '_LAST', [0.0, -1.0])
+    
     def test_cli_progress_function_exists(self):
         """Test that cli_progress function exists."""
         assert callable(cli_progress)
     
     def test_cli_progress_accepts_parameters(self):
         """Test that cli_progress accepts correct parameters."""
-        # Should not raise exception
-        try:
-            cli_progress(50.0, "Testing 50%")
-        except:
-            pytest.fail("cli_progress should accept (pct, msg) parameters")
+        # Should not raise exception; any error surfaces with its own traceback
+        cli_progress(50.0, "Testing 50%")
+    
+    @pytest.mark.parametrize("pct,filled", [(0.0, 0), (50.0, 15), (100.0, 30), (120.0, 30)])
+    def test_cli_progress_bar_width(self, capsys, pct, filled):
+        """Test that the bar is always 30 cells and the message is padded to 40."""
+        cli_progress(pct, "x" * 50)
+        out = capsys.readouterr().out
+        
+        bar = out[out.index('[') + 1:out.index(']')]
+        assert bar == '█' * filled + '-' * (30 - filled)
+        assert out.endswith("| " + "x" * 40)
+    
+    def test_cli_progress_throttles_small_updates(self, capsys):
+        """Test that rapid, tiny progress changes are not redrawn."""
+        cli_progress(10.0, "a")
+        cli_progress(10.1, "b")
+        cli_progress(100.0, "c")
+        out = capsys.readouterr().out
+        
+        assert out.count('\r') == 2
+        assert "| b" not in out
     
     def test_cli_log_function_exists(self):
         """Test that cli_log function exists."""
         assert callable(cli_log)
     
-    def test_cli_log_accepts_message(self, capsys):
+    def test_cli_log_accepts_message(self):
         """Test that cli_log accepts a message."""
-        try:
-            cli_log("Test log message")
-            captured = capsys.readouterr()
-            assert "Test log message" in captured.out or "LOG" in captured.out
-        except:
-            pytest.fail("cli_log should accept a message parameter")
+        out = StringIO()
+        cli_log("Test log message", out=out)
+        
+        assert "[LOG] Test log message" in out.getvalue()
 
 
 class TestCLIArgumentValidation:
     """Test CLI argument validation."""
     
-    def test_parser_requires_url_for_cli_mode(self):
+    def test_parser_requires_url_for_cli_mode(self, shared_parser):
         """Test that URL is required for download operations."""
-        parser = setup_parser()
-        
         # URL is optional (position), but needed for actual download
-        args = parser.parse_args([])
+        args = shared_parser.parse_args([])
         assert args.url is None
     
-    def test_parser_default_quality_is_best(self):
+    def test_parser_default_quality_is_best(self, shared_parser):
         """Test that default quality is 'best'."""
-        parser = setup_parser()
-        args = parser.parse_args(['https://www.youtube.com/watch?v=test123'])
+        args = shared_parser.parse_args(ARGV_URL_ONLY)
         
         assert args.quality == 'best'
     
-    def test_parser_default_audio_is_false(self):
+    def test_parser_default_audio_is_false(self, shared_parser):
         """Test that audio flag defaults to False."""
-        parser = setup_parser()
-        args = parser.parse_args(['https://www.youtube.com/watch?v=test123'])
+        args = shared_parser.parse_args(ARGV_URL_ONLY)
         
         assert args.audio is False
     
-    def test_parser_default_no_meta_is_false(self):
+    def test_parser_default_no_meta_is_false(self, shared_parser):
         """Test that no-meta flag defaults to False."""
-        parser = setup_parser()
-        args = parser.parse_args(['https://www.youtube.com/watch?v=test123'])
+        args = shared_parser.parse_args(ARGV_URL_ONLY)
         
         assert args.no_meta is False
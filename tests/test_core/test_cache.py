@@ -0,0 +1,161 @@
+"""Tests for the metadata cache."""
+
+import os
+import json
+import time
+import sqlite3
+from contextlib import closing
+from unittest.mock import patch
+import pytest
+
+from ytp3.core.cache import MetadataCache, cache_key
+from ytp3.core.engine import YTP3Engine
+
+
+VIDEO_ID = 'dQw4w9WgXcQ'
+
+
+@pytest.fixture
+def cache(temp_dir_rw):
+    """Provide a metadata cache backed by a fresh database file."""
+    return MetadataCache(os.path.join(temp_dir_rw, 'metadata.sqlite3'))
+
+
+class TestCacheKey:
+    """Test cache key derivation."""
+
+    @pytest.mark.parametrize("url", [
+        f'https://www.youtube.com/watch?v={VIDEO_ID}',
+        f'https://youtu.be/{VIDEO_ID}',
+        f'https://www.youtube.com/shorts/{VIDEO_ID}',
+        f'https://www.youtube.com/watch?feature=share&v={VIDEO_ID}',
+    ])
+    def test_video_urls_share_key(self, url):
+        """Test that different URL forms of a video map to its ID."""
+        assert cache_key(url) == VIDEO_ID
+
+    def test_playlist_url_keyed_by_url(self):
+        """Test that playlist URLs are not collapsed to a single video."""
+        url = f'https://www.youtube.com/watch?v={VIDEO_ID}&list=PL123'
+
+        assert cache_key(url) == url
+
+
+class TestMetadataCache:
+    """Test storing and retrieving metadata."""
+
+    def test_put_then_get(self, cache):
+        """Test a stored entry is returned for any URL of the same video."""
+        entries = [{'id': VIDEO_ID, 'title': 'Test'}]
+        cache.put(f'https://youtu.be/{VIDEO_ID}', entries)
+
+        assert cache.get(f'https://www.youtube.com/watch?v={VIDEO_ID}') == entries
+
+    def test_get_missing_returns_none(self, cache):
+        """Test that unknown URLs miss."""
+        assert cache.get('https://www.youtube.com/watch?v=aaaaaaaaaaa') is None
+
+    def test_expired_entry_returns_none(self, temp_dir_rw):
+        """Test that entries older than the TTL are ignored."""
+        cache = MetadataCache(os.path.join(temp_dir_rw, 'metadata.sqlite3'), ttl=0)
+        cache.put(VIDEO_ID, [{'id': VIDEO_ID}])
+
+        assert cache.get(VIDEO_ID) is None
+
+    def test_invalidate(self, cache):
+        """Test that invalidated entries are gone."""
+        cache.put(VIDEO_ID, [{'id': VIDEO_ID}])
+        cache.invalidate(VIDEO_ID)
+
+        assert cache.get(VIDEO_ID) is None
+
+    def test_clear(self, cache):
+        """Test that clear drops every entry."""
+        cache.put(VIDEO_ID, [{'id': VIDEO_ID}])
+        cache.put('aaaaaaaaaaa', [{'id': 'aaaaaaaaaaa'}])
+        cache.clear()
+        
+        assert cache.get(VIDEO_ID) is None
+        assert cache.get('aaaaaaaaaaa') is None
+
+    def test_oldest_entries_pruned(self, temp_dir_rw):
+        """Test that the cache keeps at most max_entries rows."""
+        path = os.path.join(temp_dir_rw, 'metadata.sqlite3')
+        cache = MetadataCache(path, max_entries=2)
+        for key in ('a' * 11, 'b' * 11, 'c' * 11):
+            cache.put(key, [{'id': key}])
+        
+        # A fresh instance reads the database rather than the in-memory tier
+        on_disk = MetadataCache(path)
+        assert on_disk.get('a' * 11) is None
+        assert on_disk.get('c' * 11) == [{'id': 'c' * 11}]
+
+    def test_memory_tier_serves_repeat_lookups(self, cache):
+        """Test that a remembered entry is returned without touching the database."""
+        cache.put(VIDEO_ID, [{'id': VIDEO_ID}])
+        
+        with patch.object(MetadataCache, '_connect', side_effect=AssertionError):
+            assert cache.get(VIDEO_ID) == [{'id': VIDEO_ID}]
+
+    def test_get_returns_private_copy(self, cache):
+        """Test that callers mutating a result do not alter the cache."""
+        cache.put(VIDEO_ID, [{'id': VIDEO_ID}])
+        cache.get(VIDEO_ID)[0]['id'] = 'changed'
+        
+        assert cache.get(VIDEO_ID) == [{'id': VIDEO_ID}]
+
+    def test_entries_kept_per_auth(self, cache):
+        """Test that entries fetched with other cookies are not returned."""
+        cache.put(VIDEO_ID, [{'id': VIDEO_ID}])
+        
+        assert cache.get(VIDEO_ID, 'cookies') is None
+        
+        cache.put(VIDEO_ID, [{'id': VIDEO_ID, 'title': 'Members'}], 'cookies')
+        assert cache.get(VIDEO_ID, 'cookies') == [{'id': VIDEO_ID, 'title': 'Members'}]
+        assert cache.get(VIDEO_ID) == [{'id': VIDEO_ID}]
+
+    def test_reads_uncompressed_entries(self, cache):
+        """Test that plain JSON rows from older versions are still readable."""
+        with closing(sqlite3.connect(cache.path)) as db, db:
+            db.execute("INSERT INTO metadata (key, json, ts) VALUES (?, ?, ?)",
+                       (VIDEO_ID, json.dumps([{'id': VIDEO_ID}]), int(time.time())))
+        
+        assert cache.get(VIDEO_ID) == [{'id': VIDEO_ID}]
+
+    def test_engine_resolve_uses_cache(self, cache, sample_opts, sample_caps):
+        """Test that the engine answers resolve_metadata from the cache."""
+        entries = [{'id': VIDEO_ID, 'title': 'Cached'}]
+        cache.put(VIDEO_ID, entries)
+        engine = YTP3Engine(sample_opts, sample_caps, log_callback=lambda m: None,
+                            metadata_cache=cache)
+
+        assert engine.resolve_metadata(f'https://youtu.be/{VIDEO_ID}') == entries
+
+    def test_engine_cache_keyed_by_cookies(self, cache, sample_opts, sample_caps, temp_dir_rw):
+        """Test that metadata fetched without cookies is not reused once cookies are set."""
+        cache.put(VIDEO_ID, [{'id': VIDEO_ID, 'title': 'Anonymous'}])
+        cookie_file = os.path.join(temp_dir_rw, 'cookies.txt')
+        with open(cookie_file, 'w') as f:
+            f.write('# Netscape HTTP Cookie File\n')
+        engine = YTP3Engine({**sample_opts, 'cookiefile': cookie_file}, sample_caps,
+                            log_callback=lambda m: None, metadata_cache=cache)
+        
+        with patch.object(YTP3Engine, '_resolve_with_strategy',
+                          return_value=[{'id': VIDEO_ID, 'title': 'Signed in'}]):
+            assert engine.resolve_metadata(VIDEO_ID)[0]['title'] == 'Signed in'
+        
+        assert cache.get(VIDEO_ID)[0]['title'] == 'Anonymous'
+
+    def test_engine_hydrates_cached_flat_entries(self, cache, sample_opts, sample_caps):
+        """Test that hydrate=True hydrates entries cached by a plain resolve."""
+        url = 'https://www.youtube.com/playlist?list=PL123'
+        cache.put(url, [{'_type': 'url', 'url': f'https://youtu.be/{VIDEO_ID}', 'id': VIDEO_ID}])
+        engine = YTP3Engine(sample_opts, sample_caps, log_callback=lambda m: None,
+                            metadata_cache=cache)
+        hydrated = [{'id': VIDEO_ID, 'title': 'Hydrated'}]
+        
+        with patch.object(YTP3Engine, 'hydrate_entries', return_value=hydrated) as hydrate:
+            assert engine.resolve_metadata(url, hydrate=True) == hydrated
+            assert engine.resolve_metadata(url, hydrate=True) == hydrated
+        
+        assert hydrate.call_count == 1
@@ -1,23 +1,33 @@
 """Tests for YTP3Engine class."""
 
+import os
+import threading
+import logging
 import pytest
-import sys
-from pathlib import Path
 from unittest.mock import Mock, patch
 
-# Add parent directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from ytp3.core.engine import YTP3Engine, _ProgressHook, _classify_error
 
-from ytp3.core.engine import YTP3Engine
+
+@pytest.fixture(scope="module", autouse=True)
+def _validate_fallbacks_once():
+    """Check the FORMAT_FALLBACKS schema a single time for this module."""
+    for quality, fallbacks in YTP3Engine.FORMAT_FALLBACKS.items():
+        assert len(fallbacks) == 5, f"Quality {quality} should have 5 fallbacks"
+        assert all(isinstance(f, tuple) and len(f) == 2 for f in fallbacks)
+
+
+@pytest.fixture(scope="class")
+def engine(sample_opts, sample_caps):
+    """Provide a single engine shared by the tests of a class."""
+    return YTP3Engine(sample_opts, sample_caps)
 
 
 class TestYTP3EngineInitialization:
     """Test engine initialization and configuration."""
     
-    def test_engine_init_basic(self, sample_opts, sample_caps):
+    def test_engine_init_basic(self, engine, sample_opts, sample_caps):
         """Test basic engine initialization."""
-        engine = YTP3Engine(sample_opts, sample_caps)
-        
         assert engine.opts == sample_opts
         assert engine.caps == sample_caps
         assert engine.log_cb is None
@@ -33,71 +43,526 @@ class TestYTP3EngineInitialization:
         assert engine.log_cb == dummy_callback
         assert engine.last_detailed_error == ""
     
-    def test_engine_strategies_available(self, sample_opts, sample_caps):
-        """Test that engine has strategies available."""
-        engine = YTP3Engine(sample_opts, sample_caps)
+    def test_engine_has_no_instance_dict(self, engine):
+        """Test that engine attributes live in slots rather than a __dict__."""
+        assert not hasattr(engine, '__dict__')
+        with pytest.raises(AttributeError):
+            engine.unexpected_attribute = True
+    
+    def test_strategy_opts_prebuilt(self, engine, sample_opts):
+        """Test that per-strategy options merge base options and strategy extras."""
+        assert len(engine._strategy_opts) == len(engine.strategies)
+        for strategy, opts in zip(engine.strategies, engine._strategy_opts):
+            assert opts['outtmpl'] == sample_opts['outtmpl']
+            assert opts['prefer_ffmpeg'] is True
+            for key, value in strategy['extra'].items():
+                assert opts[key] == value
+    
+    def test_metadata_opts_carry_auth(self, sample_caps):
+        """Test that metadata options keep cookies and strategy extras, fresh per call."""
+        engine = YTP3Engine({'cookiefile': 'cookies.txt', 'format': 'best'}, sample_caps)
+        strategy = engine.strategies[1]
+        
+        opts = engine._metadata_opts(strategy)
+        
+        assert opts['cookiefile'] == 'cookies.txt'
+        assert opts['quiet'] is True
+        assert 'format' not in opts
+        for key, value in strategy['extra'].items():
+            assert opts[key] == value
+        assert engine._metadata_opts(strategy) is not opts
+    
+    @pytest.mark.parametrize("user_args", [
+        ['-q:a', '0'],
+        {'extractaudio': ['-q:a', '0']},
+    ])
+    def test_merge_args_scoped_to_merger(self, sample_caps, user_args):
+        """Test that stream-copy merge args never reach audio extraction."""
+        engine = YTP3Engine({'postprocessor_args': user_args}, sample_caps)
+        
+        for opts in engine._strategy_opts:
+            assert opts['postprocessor_args']['merger'][:2] == ['-c:v', 'copy']
+            assert opts['postprocessor_args']['extractaudio'] == ['-q:a', '0']
+    
+    def test_strategy_opts_use_stable_ytdlp_cache(self, engine):
+        """Test that downloads point yt-dlp at the app's cache directory."""
+        for opts in engine._strategy_opts:
+            assert opts['cachedir'].endswith(os.path.join("YTP3Downloader", "yt-dlp"))
+    
+    def test_user_cachedir_overrides_default(self, sample_caps):
+        """Test that an explicit cachedir (e.g. False to disable) is kept."""
+        engine = YTP3Engine({'cachedir': False}, sample_caps)
         
+        assert all(opts['cachedir'] is False for opts in engine._strategy_opts)
+    
+    def test_engine_strategies_available(self, engine):
+        """Test that engine has strategies available."""
         assert len(engine.strategies) > 0
         assert all('name' in s and 'extra' in s for s in engine.strategies)
     
-    def test_format_fallbacks_structure(self, sample_opts, sample_caps):
+    def test_format_fallbacks_structure(self, engine):
         """Test format fallbacks are properly structured."""
-        engine = YTP3Engine(sample_opts, sample_caps)
-        
         assert 'best' in engine.FORMAT_FALLBACKS
         assert 'high' in engine.FORMAT_FALLBACKS
         assert 'medium' in engine.FORMAT_FALLBACKS
         assert 'low' in engine.FORMAT_FALLBACKS
         
-        # Each quality level should have fallback formats
-        for quality, fallbacks in engine.FORMAT_FALLBACKS.items():
-            assert len(fallbacks) == 5, f"Quality {quality} should have 5 fallbacks"
-            assert all(isinstance(f, tuple) and len(f) == 2 for f in fallbacks)
+        # Per-entry schema is validated once by _validate_fallbacks_once
+        assert engine.FORMAT_FALLBACKS is YTP3Engine.FORMAT_FALLBACKS
 
 
 class TestYTP3EngineFormatFallbacks:
     """Test format fallback logic."""
     
-    def test_fallback_for_best_quality(self, sample_opts, sample_caps):
-        """Test fallback formats for best quality."""
-        engine = YTP3Engine(sample_opts, sample_caps)
-        
-        fallbacks = engine.FORMAT_FALLBACKS['best']
+    @pytest.mark.parametrize("quality,needles", [
+        ("best", ("mp4", "m4a")),  # Layer 1 should prefer containerized formats
+        ("high", ("1080",)),       # Should be capped at 1080p
+        ("medium", ("720",)),      # Should be capped at 720p
+        ("low", ("480",)),         # Should be capped at 480p
+    ])
+    def test_fallback_for_quality(self, engine, quality, needles):
+        """Test fallback formats for each quality level."""
+        fallbacks = engine.FORMAT_FALLBACKS[quality]
         assert len(fallbacks) == 5
         
-        # Layer 1 should prefer containerized formats
-        assert 'mp4' in fallbacks[0][0]
-        assert 'm4a' in fallbacks[0][0]
+        for needle in needles:
+            assert needle in fallbacks[0][0]
+            assert needle in engine.FORMAT_FALLBACK_TOKENS[quality]
+
+
+class TestYTP3EngineDownloaderReuse:
+    """Test retargeting a shared YoutubeDL between attempts."""
     
-    def test_fallback_for_high_quality(self, sample_opts, sample_caps):
-        """Test fallback formats for high (1080p) quality."""
-        engine = YTP3Engine(sample_opts, sample_caps)
+    def test_retarget_switches_format_and_strategy(self, engine):
+        """Test that a reused downloader picks up the next attempt's options."""
+        yt_dlp = pytest.importorskip("yt_dlp")
+        android = {'youtube': {'player_client': ['android']}}
+        
+        with yt_dlp.YoutubeDL({'quiet': True, 'format': 'best', 'extractor_args': android}) as ydl:
+            engine._retarget_downloader(ydl, {'quiet': True, 'format': 'worst'}, {})
+            
+            assert ydl.params['format'] == 'worst'
+            assert 'extractor_args' not in ydl.params
+            assert callable(ydl.format_selector)
+    
+    def test_retarget_reuses_compiled_selectors(self, engine):
+        """Test that each format string is compiled once per downloader."""
+        yt_dlp = pytest.importorskip("yt_dlp")
+        selectors = {}
+        
+        with yt_dlp.YoutubeDL({'quiet': True, 'format': 'best'}) as ydl:
+            engine._retarget_downloader(ydl, {'format': 'worst'}, selectors)
+            first = ydl.format_selector
+            engine._retarget_downloader(ydl, {'format': 'best'}, selectors)
+            engine._retarget_downloader(ydl, {'format': 'worst'}, selectors)
+            
+            assert ydl.format_selector is first
+            assert set(selectors) == {'worst', 'best'}
+
+
+class TestYTP3EngineValidation:
+    """Test the pre-flight check on resolved metadata."""
+    
+    @pytest.mark.parametrize("info", [
+        {'availability': 'private'},
+        {'duration': 7200},
+        {'filesize_approx': 5 * 1024 ** 3},
+    ])
+    def test_doomed_items_rejected(self, sample_opts, sample_caps, info):
+        """Test that private and oversized items are rejected."""
+        opts = {**sample_opts, 'max_duration': 3600, 'max_filesize': 1024 ** 3}
+        engine = YTP3Engine(opts, sample_caps, log_callback=lambda m: None)
+        
+        with pytest.raises(Exception):
+            engine._validate_item(info)
+        assert engine.last_detailed_error
+    
+    def test_ordinary_item_accepted(self, sample_opts, sample_caps):
+        """Test that a public on-demand video passes without limits configured."""
+        engine = YTP3Engine(sample_opts, sample_caps, log_callback=lambda m: None)
         
-        fallbacks = engine.FORMAT_FALLBACKS['high']
-        assert len(fallbacks) == 5
+        engine._validate_item({'availability': 'public', 'duration': 7200, 'is_live': False})
+    
+    @pytest.mark.parametrize("info", [
+        {'availability': 'needs_auth'},
+        {'availability': 'subscriber_only'},
+        {'availability': 'premium_only'},
+        {'is_live': True},
+    ])
+    def test_auth_and_live_items_accepted(self, sample_opts, sample_caps, info):
+        """Test that items needing cookies, and live streams, are left to the download."""
+        engine = YTP3Engine(sample_opts, sample_caps, log_callback=lambda m: None)
+        
+        engine._validate_item(info)
+
+
+class TestYTP3EngineIterMetadata:
+    """Test streaming metadata extraction."""
+    
+    def test_playlist_entries_streamed(self, sample_opts, sample_caps):
+        """Test that playlist entries are yielded as they are produced."""
+        engine = YTP3Engine(sample_opts, sample_caps, log_callback=lambda m: None)
+        produced = []
+        
+        def entries():
+            for idx in range(3):
+                produced.append(idx)
+                yield {'id': str(idx)} if idx != 1 else None
+        
+        ydl = Mock()
+        ydl.extract_info.return_value = {'_type': 'playlist', 'entries': entries()}
+        yt_dlp = Mock()
+        yt_dlp.YoutubeDL.return_value.__enter__ = Mock(return_value=ydl)
+        yt_dlp.YoutubeDL.return_value.__exit__ = Mock(return_value=False)
+        
+        with patch('ytp3.core.engine._load_yt_dlp', return_value=yt_dlp):
+            stream = engine.iter_metadata('https://www.youtube.com/playlist?list=PL1')
+            
+            assert next(stream) == {'id': '0'}
+            assert produced == [0]
+            assert list(stream) == [{'id': '2'}]
+
+
+class TestYTP3EngineHydration:
+    """Test concurrent hydration of flat playlist entries."""
+    
+    def test_hydrate_preserves_order_and_failures(self, sample_opts, sample_caps):
+        """Test that hydrated entries keep their order and failures stay flat."""
+        engine = YTP3Engine(sample_opts, sample_caps, log_callback=lambda m: None)
+        entries = [
+            {'_type': 'url', 'url': 'https://youtu.be/a', 'id': 'a'},
+            {'_type': 'url', 'url': 'https://youtu.be/bad', 'id': 'bad'},
+            {'id': 'full', 'title': 'Already resolved'},
+            {'_type': 'url', 'url': 'https://youtu.be/c', 'id': 'c'},
+        ]
+        
+        def extract(url, download=False, process=True):
+            if url.endswith('bad'):
+                raise Exception("Video unavailable")
+            return {'id': url[-1], 'title': f"Title {url[-1]}"}
+        
+        yt_dlp = Mock()
+        yt_dlp.YoutubeDL.return_value.__enter__ = Mock(return_value=Mock(extract_info=extract))
+        yt_dlp.YoutubeDL.return_value.__exit__ = Mock(return_value=False)
+        
+        with patch('ytp3.core.engine._load_yt_dlp', return_value=yt_dlp):
+            results = engine.hydrate_entries(entries, max_workers=2)
+        
+        assert [r.get('title') for r in results] == ['Title a', None, 'Already resolved', 'Title c']
+        assert yt_dlp.YoutubeDL.call_count == 2
+    
+    def test_hydrate_paced_by_rate_limiter(self, sample_opts, sample_caps):
+        """Test that every hydration extract takes a rate-limiter token."""
+        engine = YTP3Engine(sample_opts, sample_caps, log_callback=lambda m: None)
+        entries = [{'_type': 'url', 'url': f'https://youtu.be/{c}', 'id': c} for c in 'abcde']
+        
+        yt_dlp = Mock()
+        yt_dlp.YoutubeDL.return_value.__enter__ = Mock(return_value=Mock(
+            extract_info=lambda url, download=False, process=True: {'id': url[-1]}))
+        yt_dlp.YoutubeDL.return_value.__exit__ = Mock(return_value=False)
         
-        # Should be capped at 1080p
-        assert '1080' in fallbacks[0][0]
+        with patch('ytp3.core.engine._load_yt_dlp', return_value=yt_dlp), \
+                patch.object(engine.rate_limiter, 'acquire') as acquire:
+            engine.hydrate_entries(entries, max_workers=2)
+        
+        assert acquire.call_count == len(entries)
+
+
+class TestYTP3EngineMetadataRace:
+    """Test concurrent metadata resolution across strategies."""
     
-    def test_fallback_for_medium_quality(self, sample_opts, sample_caps):
-        """Test fallback formats for medium (720p) quality."""
-        engine = YTP3Engine(sample_opts, sample_caps)
+    @pytest.fixture(autouse=True)
+    def _no_stagger(self, monkeypatch):
+        """Start every strategy immediately."""
+        monkeypatch.setattr(YTP3Engine, 'METADATA_STAGGER', 0.0)
+    
+    def test_first_successful_strategy_wins(self, sample_opts, sample_caps):
+        """Test that a retryable failure falls through to another strategy."""
+        engine = YTP3Engine(sample_opts, sample_caps, log_callback=lambda m: None)
         
-        fallbacks = engine.FORMAT_FALLBACKS['medium']
-        assert len(fallbacks) == 5
+        def fake_resolve(yt_dlp, strategy, url):
+            if strategy['name'] == 'Standard':
+                raise Exception("Video not available")
+            return [{'id': strategy['name']}]
         
-        # Should be capped at 720p
-        assert '720' in fallbacks[0][0]
+        with patch('ytp3.core.engine._load_yt_dlp'), \
+                patch.object(YTP3Engine, '_resolve_with_strategy', side_effect=fake_resolve):
+            results = engine.resolve_metadata('https://youtu.be/x')
+        
+        assert len(results) == 1
+        assert results[0]['id'] != 'Standard'
     
-    def test_fallback_for_low_quality(self, sample_opts, sample_caps):
-        """Test fallback formats for low (480p) quality."""
-        engine = YTP3Engine(sample_opts, sample_caps)
+    def test_all_strategies_failing_raises(self, sample_opts, sample_caps):
+        """Test that the last error is reported when every strategy fails."""
+        engine = YTP3Engine(sample_opts, sample_caps, log_callback=lambda m: None)
         
-        fallbacks = engine.FORMAT_FALLBACKS['low']
-        assert len(fallbacks) == 5
+        with patch('ytp3.core.engine._load_yt_dlp'), \
+                patch.object(YTP3Engine, '_resolve_with_strategy', side_effect=Exception("not available")):
+            with pytest.raises(Exception, match="Metadata fetch failed"):
+                engine.resolve_metadata('https://youtu.be/x')
+        
+        assert "not available" in engine.last_detailed_error
+    
+    def test_cookie_error_raises_immediately(self, sample_opts, sample_caps):
+        """Test that invalid cookie files abort resolution."""
+        engine = YTP3Engine(sample_opts, sample_caps, log_callback=lambda m: None)
+        
+        with patch('ytp3.core.engine._load_yt_dlp'), \
+                patch.object(YTP3Engine, '_resolve_with_strategy',
+                             side_effect=Exception("cookies are not in Netscape format")):
+            with pytest.raises(Exception, match="Invalid Cookie File"):
+                engine.resolve_metadata('https://youtu.be/x')
+
+
+class TestYTP3EngineDownloadPacing:
+    """Test the anti-rate-limit delay before downloads."""
+    
+    @staticmethod
+    def _stop(msg):
+        """Log sink that aborts the download once the pacing step is over."""
+        raise RuntimeError(msg)
+    
+    def _start_download(self, engine):
+        """Run download_single_item up to its first log line, returning the sleeps."""
+        with patch.object(YTP3Engine, '_wait') as wait, patch('ytp3.core.engine._load_yt_dlp'):
+            with pytest.raises(RuntimeError):
+                engine.download_single_item('https://youtu.be/x')
+        return wait.call_count
+    
+    def test_first_download_not_delayed(self, sample_opts, sample_caps):
+        """Test that a lone download starts without the random delay."""
+        engine = YTP3Engine(sample_opts, sample_caps, log_callback=self._stop)
+        
+        assert self._start_download(engine) == 0
+    
+    def test_burst_download_delayed(self, sample_opts, sample_caps):
+        """Test that downloads beyond the burst budget are spaced out."""
+        engine = YTP3Engine(sample_opts, sample_caps, log_callback=self._stop)
+        for _ in range(YTP3Engine.REQUEST_BURST):
+            assert self._start_download(engine) == 0
+        
+        assert self._start_download(engine) == 1
+    
+    def test_rate_limit_backoff_grows(self, sample_opts, sample_caps):
+        """Test that consecutive rate limits back off exponentially, then reset."""
+        engine = YTP3Engine(sample_opts, sample_caps, log_callback=lambda m: None)
+        yt_dlp = Mock()
+        yt_dlp.YoutubeDL.return_value.download.side_effect = [
+            Exception("HTTP Error 429: Too Many Requests"),
+            Exception("HTTP Error 429: Too Many Requests"),
+            None,
+        ]
+        
+        with patch('ytp3.core.engine._load_yt_dlp', return_value=yt_dlp), \
+                patch.object(YTP3Engine, '_wait') as wait:
+            assert engine.download_single_item('https://youtu.be/x') is True
+        
+        delays = [c.args[0] for c in wait.call_args_list if c.args[0]]
+        assert 30 <= delays[0] <= 35
+        assert 60 <= delays[1] <= 65
+        assert engine._rl_attempts == 0
+    
+    def test_successful_strategy_tried_first_next_time(self, sample_opts, sample_caps):
+        """Test that the strategy that last succeeded leads the next download."""
+        logged = []
+        engine = YTP3Engine(sample_opts, sample_caps, log_callback=logged.append)
+        yt_dlp = Mock()
+        yt_dlp.YoutubeDL.return_value.download.side_effect = [
+            Exception("HTTP Error 403: Forbidden"),
+            None,
+            None,
+        ]
+        
+        with patch('ytp3.core.engine._load_yt_dlp', return_value=yt_dlp), \
+                patch.object(YTP3Engine, '_wait'):
+            engine.download_single_item('https://youtu.be/x')
+            logged.clear()
+            engine.download_single_item('https://youtu.be/y')
+        
+        first = next(m for m in logged if m.startswith("[STRATEGY]"))
+        assert engine.strategies[1]['name'] in first
+    
+    def test_error_prunes_remaining_schedule(self, sample_opts, sample_caps):
+        """Test that an age gate skips straight to the only strategy that can help."""
+        logged = []
+        engine = YTP3Engine(sample_opts, sample_caps, log_callback=logged.append)
+        yt_dlp = Mock()
+        yt_dlp.YoutubeDL.return_value.download.side_effect = [
+            Exception("Sign in to confirm your age"),
+            None,
+        ]
+        
+        with patch('ytp3.core.engine._load_yt_dlp', return_value=yt_dlp), \
+                patch.object(YTP3Engine, '_wait'):
+            engine.download_single_item('https://youtu.be/x')
+        
+        strategies = [m for m in logged if m.startswith("[STRATEGY]")]
+        assert len(strategies) == 2
+        assert "TV Bypass" in strategies[1]
+    
+    def test_repeated_error_traceback_logged_once(self, sample_opts, sample_caps):
+        """Test that an error repeating across attempts logs its traceback once."""
+        logged = []
+        engine = YTP3Engine(sample_opts, sample_caps, log_callback=logged.append,
+                            log_level=logging.DEBUG)
+        yt_dlp = Mock()
+        yt_dlp.YoutubeDL.return_value.download.side_effect = [
+            Exception("Connection reset by peer"),
+            Exception("Connection reset by peer"),
+            None,
+        ]
+        
+        with patch('ytp3.core.engine._load_yt_dlp', return_value=yt_dlp), \
+                patch.object(YTP3Engine, '_wait'):
+            engine.download_single_item('https://youtu.be/x')
+        
+        assert sum(m.startswith("[DEBUG] Traceback") for m in logged) == 1
+        assert sum(m.startswith("[DEBUG] Repeat") for m in logged) == 1
+    
+    def test_cancel_aborts_running_transfer(self, sample_opts, sample_caps):
+        """Test that the cancel progress hook stops a transfer in flight."""
+        engine = YTP3Engine(sample_opts, sample_caps, log_callback=lambda m: None)
+        engine._raise_if_cancelled({'status': 'downloading'})
+        engine.cancel()
+        
+        with pytest.raises(Exception, match="cancelled"):
+            engine._raise_if_cancelled({'status': 'downloading'})
+    
+    def test_cancel_interrupts_wait(self, sample_opts, sample_caps):
+        """Test that cancel() wakes a pending wait with an error."""
+        engine = YTP3Engine(sample_opts, sample_caps, log_callback=lambda m: None)
+        engine.cancel()
+        
+        with pytest.raises(Exception, match="cancelled"):
+            engine._wait(60)
+
+
+class TestYTP3EngineInflightDedupe:
+    """Test joining duplicate downloads that are already running."""
+    
+    def test_duplicate_url_joins_running_download(self, sample_opts, sample_caps):
+        """Test that two forms of one video URL download it only once."""
+        engine = YTP3Engine(sample_opts, sample_caps, log_callback=lambda m: None)
+        started, release = threading.Event(), threading.Event()
+        calls = []
+        
+        def slow_download(url, progress_callback):
+            calls.append(url)
+            started.set()
+            release.wait(5)
+            return True
+        
+        with patch.object(YTP3Engine, '_download_single_item', side_effect=slow_download):
+            first = threading.Thread(target=engine.download_single_item,
+                                     args=('https://www.youtube.com/watch?v=dQw4w9WgXcQ',))
+            first.start()
+            started.wait(5)
+            threading.Timer(0.1, release.set).start()
+            
+            assert engine.download_single_item('https://youtu.be/dQw4w9WgXcQ') is True
+            first.join(5)
+        
+        assert len(calls) == 1
+        assert engine._inflight == {}
+
+
+class TestYTP3EnginePlaylist:
+    """Test concurrent playlist downloads."""
+    
+    def test_download_playlist_collects_results(self, sample_opts, sample_caps):
+        """Test that each URL reports success or its error and progress reaches 100%."""
+        engine = YTP3Engine(sample_opts, sample_caps, log_callback=lambda m: None)
+        progress = []
+        
+        def fake_download(url, progress_callback=None):
+            if url == 'bad':
+                raise Exception("boom")
+            return True
+        
+        with patch.object(YTP3Engine, 'download_single_item', side_effect=fake_download):
+            results = engine.download_playlist(['a', 'bad', 'c'], lambda p, m: progress.append(p), max_workers=2)
+        
+        assert results == {'a': None, 'bad': 'boom', 'c': None}
+        assert progress[-1] == 100.0
+    
+    def test_download_playlist_empty(self, engine):
+        """Test that an empty playlist does nothing."""
+        assert engine.download_playlist([]) == {}
+
+
+class TestProgressHook:
+    """Test translation of yt-dlp progress events."""
+    
+    @pytest.mark.parametrize("percent_str", ["42.5%", " 42.5%", "\x1b[0;94m 42.5%\x1b[0m"])
+    def test_downloading_percent_parsed(self, percent_str):
+        """Test that plain and ANSI-colored percentages are parsed."""
+        calls = []
+        _ProgressHook(lambda p, m: calls.append((p, m)))({
+            'status': 'downloading', '_percent_str': percent_str,
+            '_speed_str': '1MiB/s', '_eta_str': '00:10', '_total_bytes_str': '10MiB',
+        })
+        
+        assert calls == [(42.5, "[DOWNLOADING] 1MiB/s | ETA: 00:10 | 10MiB")]
+    
+    @pytest.mark.parametrize("percent_str", ["N/A", "", None, "1.2.3%"])
+    def test_unparseable_percent_ignored(self, percent_str):
+        """Test that malformed percentages are skipped."""
+        calls = []
+        _ProgressHook(lambda p, m: calls.append(p))({'status': 'downloading', '_percent_str': percent_str})
+        
+        assert calls == []
+    
+    def test_downloading_uses_byte_counts(self):
+        """Test that numeric byte counts take precedence over the percent string."""
+        calls = []
+        _ProgressHook(lambda p, m: calls.append((p, m)))({
+            'status': 'downloading', '_percent_str': '\x1b[0;94m 99.9%\x1b[0m',
+            'downloaded_bytes': 256 * 1024, 'total_bytes': 1024 * 1024,
+            'speed': 2 * 1024 * 1024, 'eta': 75,
+        })
+        
+        assert calls == [(25.0, "[DOWNLOADING] 2.00MiB/s | ETA: 01:15 | 1.00MiB")]
+    
+    def test_finished_reports_post_processing(self):
+        """Test the finished event maps to 95%."""
+        calls = []
+        _ProgressHook(lambda p, m: calls.append(p))({'status': 'finished'})
+        
+        assert calls == [95.0]
+    
+    def test_rapid_ticks_throttled(self):
+        """Test that bursts of download ticks are coalesced but completion is not."""
+        calls = []
+        hook = _ProgressHook(lambda p, m: calls.append(p))
         
-        # Should be capped at 480p
-        assert '480' in fallbacks[0][0]
+        for pct in ("10%", "11%", "12%"):
+            hook({'status': 'downloading', '_percent_str': pct})
+        hook({'status': 'finished'})
+        
+        assert calls == [10.0, 95.0]
+
+
+class TestErrorClassification:
+    """Test which retry dimension an error maps to."""
+    
+    @pytest.mark.parametrize("msg,category", [
+        ("ERROR: unable to download video data: HTTP Error 403: Forbidden", 'strategy'),
+        ("The uploader has not made this video available in your country (geo restriction)", 'strategy'),
+        ("Requested format is not available", 'format'),
+        ("HTTP Error 429: Too Many Requests", 'rate'),
+        ("You are being Rate-Limited by YouTube", 'rate'),
+        ("invalid Netscape format cookies file", 'cookie'),
+        ("Postprocessing: Audio conversion failed: exit code -22", 'audio'),
+        ("ERROR: [youtube] abc: Private video. Sign in if you've been granted access", 'gone'),
+        ("Connection reset by peer", None),
+        # Mixed messages resolve by priority, not by word order
+        ("HTTP Error 403: Forbidden (after HTTP Error 429)", 'rate'),
+        ("HTTP Error 429 on retry; first attempt: HTTP Error 403", 'rate'),
+        ("Requested format unavailable: HTTP Error 403", 'strategy'),
+    ])
+    def test_classify_error(self, msg, category):
+        """Test representative yt-dlp errors."""
+        assert _classify_error(msg) == category
 
 
 class TestYTP3EngineLogging:
@@ -124,14 +589,35 @@ class TestYTP3EngineLogging:
         
         assert "Test message" in logged_messages
     
-    def test_log_formats_message_with_prefix(self, sample_opts, sample_caps, capsys):
-        """Test that log messages get formatted with [INFO] prefix."""
-        engine = YTP3Engine(sample_opts, sample_caps)
+    def test_log_formats_message_with_prefix(self, sample_opts, sample_caps):
+        """Test that log messages reach the sink unchanged."""
+        logged_messages = []
+        engine = YTP3Engine(sample_opts, sample_caps, log_callback=logged_messages.append)
         
         engine.log("Debug info")
-        captured = capsys.readouterr()
         
-        assert "Debug info" in captured.out
+        assert logged_messages == ["Debug info"]
+    
+    def test_log_debug_skipped_above_debug_level(self, sample_opts, sample_caps):
+        """Test that debug messages are not even built at the default level."""
+        messages = []
+        make_msg = Mock(return_value="expensive")
+        engine = YTP3Engine(sample_opts, sample_caps, log_callback=messages.append)
+        
+        engine.log_debug(make_msg)
+        
+        make_msg.assert_not_called()
+        assert messages == []
+    
+    def test_log_debug_emitted_at_debug_level(self, sample_opts, sample_caps):
+        """Test that debug messages reach the sink at DEBUG level."""
+        messages = []
+        engine = YTP3Engine(sample_opts, sample_caps, log_callback=messages.append,
+                            log_level=logging.DEBUG)
+        
+        engine.log_debug(lambda: "expensive")
+        
+        assert messages == ["expensive"]
     
     def test_log_callback_multiple_calls(self, sample_opts, sample_caps):
         """Test callback receives all logged messages."""
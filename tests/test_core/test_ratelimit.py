@@ -0,0 +1,32 @@
+"""Tests for request pacing."""
+
+import pytest
+
+from ytp3.core.ratelimit import TokenBucket
+
+
+class TestTokenBucket:
+    """Test the token bucket rate limiter."""
+    
+    def test_burst_is_free(self):
+        """Test that up to capacity acquisitions never wait."""
+        bucket = TokenBucket(rate=1.0, capacity=3)
+        waits = []
+        
+        for _ in range(3):
+            bucket.acquire(waits.append)
+        
+        assert waits == []
+    
+    def test_waits_once_budget_spent(self):
+        """Test that acquisitions beyond the burst wait for a refill."""
+        bucket = TokenBucket(rate=2.0, capacity=1)
+        waits = []
+        
+        bucket.acquire(waits.append)
+        bucket.acquire(waits.append)
+        bucket.acquire(waits.append)
+        
+        assert len(waits) == 2
+        assert waits[0] == pytest.approx(0.5, abs=0.05)
+        assert waits[1] == pytest.approx(1.0, abs=0.05)
@@ -1,10 +1,7 @@
 """Tests for download strategies."""
 
 import pytest
-import sys
-from pathlib import Path
-
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from collections import Counter
 
 from ytp3.core.strategies import DownloadStrategy
 
@@ -17,7 +14,15 @@ class TestDownloadStrategyRetrieval:
         strategies = DownloadStrategy.get_all()
         
         assert len(strategies) > 0
-        assert isinstance(strategies, list)
+        assert isinstance(strategies, tuple)
+    
+    def test_get_all_returns_cached_strategies(self):
+        """Test that repeated calls return the same read-only data."""
+        strategies = DownloadStrategy.get_all()
+        
+        assert DownloadStrategy.get_all() is strategies
+        with pytest.raises(TypeError):
+            strategies[0]['name'] = 'Changed'
     
     def test_strategy_structure(self):
         """Test that strategies have required fields."""
@@ -32,9 +37,10 @@ class TestDownloadStrategyRetrieval:
     def test_strategy_names_unique(self):
         """Test that strategy names are unique."""
         strategies = DownloadStrategy.get_all()
-        names = [s['name'] for s in strategies]
+        counts = Counter(s['name'] for s in strategies)
+        dups = [name for name, count in counts.items() if count > 1]
         
-        assert len(names) == len(set(names)), "Strategy names should be unique"
+        assert not dups, f"Strategy names should be unique, duplicates: {dups}"
     
     def test_has_standard_strategy(self):
         """Test that Standard strategy exists."""
@@ -78,3 +84,11 @@ class TestStrategyConfiguration:
         # Strategies should be usable for the 20 attempt combinations
         # (4 strategies × 5 format levels)
         assert len(strategies) >= 1
+    
+    def test_follow_ups_for_known_errors(self):
+        """Test that known errors narrow the strategies worth retrying."""
+        names = {s['name'] for s in DownloadStrategy.get_all()}
+        
+        assert DownloadStrategy.follow_ups("Sign in to confirm your age") == {"TV Bypass"}
+        assert DownloadStrategy.follow_ups("Signatures extraction failed") <= names
+        assert DownloadStrategy.follow_ups("HTTP Error 403: Forbidden") is None
@@ -1,49 +1,36 @@
 """Tests for edge case scenarios and option combinations."""
 
 import pytest
-import sys
-from pathlib import Path
-
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
-from ytp3.cli import setup_parser
 
 
 class TestAudioModeWithSponsorBlock:
     """Test that SponsorBlock is properly handled in audio mode."""
     
-    def test_audio_mode_disables_sponsorblock(self):
+    def test_audio_mode_disables_sponsorblock(self, shared_parser):
         """Test that audio mode should skip sponsorblock setting."""
         # This is a logic test - we can't actually set sponsorblock from CLI
         # but we can verify the parser accepts the combination
-        parser = setup_parser()
-        
         # Audio mode should be accepted
-        args = parser.parse_args(['-a', '-f', 'mp3', 'https://www.youtube.com/watch?v=test'])
+        args = shared_parser.parse_args(['-a', '-f', 'mp3', 'https://www.youtube.com/watch?v=test'])
         
         assert args.audio is True
         assert args.format == 'mp3'
     
-    def test_parser_accepts_audio_and_format_combination(self):
+    @pytest.mark.parametrize("fmt", ['mp3', 'wav', 'm4a', 'aac', 'opus', 'vorbis'])
+    def test_parser_accepts_audio_and_format_combination(self, shared_parser, fmt):
         """Test that parser accepts audio mode with various formats."""
-        parser = setup_parser()
+        args = shared_parser.parse_args(['-a', '-f', fmt, 'https://www.youtube.com/watch?v=test'])
         
-        formats = ['mp3', 'wav', 'm4a', 'aac', 'opus', 'vorbis']
-        
-        for fmt in formats:
-            args = parser.parse_args(['-a', '-f', fmt, 'https://www.youtube.com/watch?v=test'])
-            
-            assert args.audio is True
-            assert args.format == fmt
+        assert args.audio is True
+        assert args.format == fmt
 
 
 class TestVideoModeWithSponsorBlock:
     """Test that SponsorBlock works correctly in video mode."""
     
-    def test_parser_accepts_video_mode_default(self):
+    def test_parser_accepts_video_mode_default(self, shared_parser):
         """Test that video mode is the default."""
-        parser = setup_parser()
-        args = parser.parse_args(['https://www.youtube.com/watch?v=test'])
+        args = shared_parser.parse_args(['https://www.youtube.com/watch?v=test'])
         
         # Audio mode should default to False
         assert args.audio is False
@@ -52,15 +39,9 @@ class TestVideoModeWithSponsorBlock:
 class TestEdgeCaseDocumentation:
     """Test that edge cases are documented."""
     
-    def test_development_md_has_edge_cases_table(self):
+    def test_development_md_has_edge_cases_table(self, development_md):
         """Test that DEVELOPMENT.md contains edge cases documentation."""
-        import os
-        
-        dev_file = 'DEVELOPMENT.md'
-        assert os.path.exists(dev_file), "DEVELOPMENT.md should exist"
-        
-        with open(dev_file, 'r', encoding='utf-8') as f:
-            content = f.read()
+        content = development_md
         
         # Should have edge cases section
         assert 'Edge Cases' in content, "Should have Edge Cases section"
@@ -68,10 +49,9 @@ class TestEdgeCaseDocumentation:
         assert 'Audio' in content, "Should document Audio mode edge cases"
         assert 'Mode' in content or 'mode' in content, "Should mention mode combinations"
     
-    def test_edge_case_table_documents_audio_sponsor_issue(self):
+    def test_edge_case_table_documents_audio_sponsor_issue(self, development_md):
         """Test that the edge case table documents Audio+SponsorBlock interaction."""
-        with open('DEVELOPMENT.md', 'r', encoding='utf-8') as f:
-            content = f.read()
+        content = development_md
         
         # Should mention the specific issue
         assert 'Audio' in content and 'SponsorBlock' in content, \
@@ -85,24 +65,19 @@ class TestEdgeCaseDocumentation:
 class TestOptionHandlingLogic:
     """Test the logic of option handling in different modes."""
     
-    def test_audio_codec_map_comprehensiveness(self):
+    def test_audio_codec_map_comprehensiveness(self, shared_parser):
         """Test that audio codec map covers common formats."""
         # This tests that the CLI has proper codec mapping
-        from ytp3.cli import setup_parser
-        
-        parser = setup_parser()
-        args = parser.parse_args(['-a', '-f', 'mp3', 'https://www.youtube.com/watch?v=test'])
+        args = shared_parser.parse_args(['-a', '-f', 'mp3', 'https://www.youtube.com/watch?v=test'])
         
         # Should accept common audio formats
         assert args.format in ['mp3', 'wav', 'm4a', 'aac', 'opus', 'vorbis']
     
-    def test_format_selection_audio_modes(self):
+    def test_format_selection_audio_modes(self, shared_parser):
         """Test various audio format selections."""
-        parser = setup_parser()
-        
         audio_formats = ['mp3', 'wav', 'm4a']
         
         for fmt in audio_formats:
-            args = parser.parse_args(['-a', '-f', fmt, 'https://example.com/test'])
+            args = shared_parser.parse_args(['-a', '-f', fmt, 'https://example.com/test'])
             assert args.format == fmt
             assert args.audio is True
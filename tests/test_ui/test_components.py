@@ -1,10 +1,6 @@
 """Tests for UI components."""
 
 import pytest
-import sys
-from pathlib import Path
-
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 # Note: Full UI testing requires a display server
 # These tests focus on component initialization and logic
@@ -2,11 +2,7 @@
 
 import pytest
 import json
-import sys
 import os
-from pathlib import Path
-
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from ytp3.utils.config import ConfigManager
 
@@ -41,23 +37,24 @@ class TestConfigManagerInitialization:
 class TestConfigManagerPersistence:
     """Test configuration saving and loading."""
     
-    def test_save_config(self, temp_dir, sample_config):
+    def test_save_config(self, temp_dir_rw, sample_config_data):
         """Test saving configuration."""
-        config_file = os.path.join(temp_dir, 'test_config.json')
+        config_file = os.path.join(temp_dir_rw, 'test_config.json')
         config = ConfigManager(config_file)
         
-        config.data = sample_config
+        config.data = sample_config_data
         config.save()
         
         assert os.path.exists(config_file)
+        assert not os.path.exists(config_file + '.tmp')
     
-    def test_load_config(self, temp_dir, sample_config):
+    def test_load_config(self, temp_dir_rw, sample_config, sample_config_data):
         """Test loading configuration."""
-        config_file = os.path.join(temp_dir, 'test_config.json')
+        config_file = os.path.join(temp_dir_rw, 'test_config.json')
         
         # Write config file
         with open(config_file, 'w') as f:
-            json.dump(sample_config, f)
+            json.dump(sample_config_data, f)
         
         # Load config
         config = ConfigManager(config_file)
@@ -65,13 +62,13 @@ class TestConfigManagerPersistence:
         
         assert loaded_data == sample_config
     
-    def test_config_roundtrip(self, temp_dir, sample_config):
+    def test_config_roundtrip(self, temp_dir_rw, sample_config, sample_config_data):
         """Test save and load roundtrip."""
-        config_file = os.path.join(temp_dir, 'test_config.json')
+        config_file = os.path.join(temp_dir_rw, 'test_config.json')
         
         # Save
         config1 = ConfigManager(config_file)
-        config1.data = sample_config
+        config1.data = sample_config_data
         config1.save()
         
         # Load
@@ -80,12 +77,12 @@ class TestConfigManagerPersistence:
         
         assert loaded_data == sample_config
     
-    def test_load_returns_data(self, temp_dir, sample_config):
+    def test_load_returns_data(self, temp_dir_rw, sample_config, sample_config_data):
         """Test that load method returns the data dictionary."""
-        config_file = os.path.join(temp_dir, 'test_config.json')
+        config_file = os.path.join(temp_dir_rw, 'test_config.json')
         
         with open(config_file, 'w') as f:
-            json.dump(sample_config, f)
+            json.dump(sample_config_data, f)
         
         config = ConfigManager(config_file)
         result = config.load()
@@ -93,6 +90,24 @@ class TestConfigManagerPersistence:
         assert isinstance(result, dict)
         assert result == sample_config
     
+    def test_load_reuses_cache_until_file_changes(self, temp_dir_rw):
+        """Test that cached data is isolated per instance and refreshed on change."""
+        config_file = os.path.join(temp_dir_rw, 'test_config.json')
+        with open(config_file, 'w') as f:
+            json.dump({'toggles': {'meta': True}}, f)
+        
+        first = ConfigManager(config_file).load()
+        first['toggles']['meta'] = False
+        assert ConfigManager(config_file).load()['toggles']['meta'] is True
+        
+        with open(config_file, 'w') as f:
+            json.dump({'toggles': {'meta': False}, 'concurrency': 4}, f)
+        os.utime(config_file, ns=(0, 0))
+        
+        reloaded = ConfigManager(config_file).load()
+        assert reloaded['toggles']['meta'] is False
+        assert reloaded['concurrency'] == 4
+    
     def test_load_nonexistent_file(self, temp_dir):
         """Test loading from a nonexistent file returns defaults."""
         config_file = os.path.join(temp_dir, 'nonexistent.json')
@@ -106,9 +121,9 @@ class TestConfigManagerPersistence:
 class TestConfigManagerDataTypes:
     """Test configuration data type handling."""
     
-    def test_config_save_preserves_types(self, temp_dir):
+    def test_config_save_preserves_types(self, temp_dir_rw):
         """Test that save/load preserves data types."""
-        config_file = os.path.join(temp_dir, 'test_config.json')
+        config_file = os.path.join(temp_dir_rw, 'test_config.json')
         
         test_data = {
             'string': 'value',
@@ -138,21 +153,15 @@ class TestConfigManagerDataTypes:
 class TestConfigManagerInitialize:
     """Test ConfigManager initialize method."""
     
-    def test_initialize_portable_mode(self, temp_dir):
+    def test_initialize_portable_mode(self, temp_dir_rw, monkeypatch):
         """Test initialize in portable mode."""
         config = ConfigManager()
+        monkeypatch.chdir(temp_dir_rw)
         
-        # Change to temp dir
-        old_cwd = os.getcwd()
-        os.chdir(temp_dir)
+        config.initialize(is_portable=True)
         
-        try:
-            config.initialize(is_portable=True)
-            
-            # Should set config_file to local path
-            assert config.config_file == "ytp3_config.json"
-        finally:
-            os.chdir(old_cwd)
+        # Should set config_file to local path
+        assert config.config_file == "ytp3_config.json"
     
     def test_initialize_non_portable_mode(self):
         """Test initialize in non-portable mode."""
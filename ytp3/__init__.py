@@ -7,8 +7,26 @@ Version: 3.0.0
 __version__ = "3.0.0"
 __author__ = "YTP3 Development Team"
 
-from .core.engine import YTP3Engine
-from .utils.config import ConfigManager
-from .utils.system import SystemDoctor
-
 __all__ = ["YTP3Engine", "ConfigManager", "SystemDoctor"]
+
+# Public names are imported on first access (PEP 562) so that importing a
+# submodule or running ``ytp3 --help`` does not load the whole package.
+_lazy = {
+    "YTP3Engine": ("ytp3.core.engine", "YTP3Engine"),
+    "ConfigManager": ("ytp3.utils.config", "ConfigManager"),
+    "SystemDoctor": ("ytp3.utils.system", "SystemDoctor"),
+}
+
+
+def __getattr__(name):
+    if name in _lazy:
+        import importlib
+        mod, attr = _lazy[name]
+        val = getattr(importlib.import_module(mod), attr)
+        globals()[name] = val
+        return val
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_lazy))
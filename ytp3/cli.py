@@ -2,14 +2,17 @@
 
 import os
 import sys
-import argparse
-
-from ytp3.core.engine import YTP3Engine
-from ytp3.utils.system import SystemDoctor, PathManager
+import time
+import logging
+import functools
+from types import SimpleNamespace
 
 
+@functools.lru_cache(maxsize=1)
 def setup_parser():
-    """Setup CLI argument parser."""
+    """Setup CLI argument parser (built once and reused)."""
+    import argparse
+    
     p = argparse.ArgumentParser(
         description="YTP3Downloader - Modern YouTube downloader",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -39,130 +42,170 @@ Examples:
     return p
 
 
+# Parsed values for a bare ``ytp3 URL`` call; must mirror setup_parser's defaults
+_URL_ONLY_DEFAULTS = {
+    'audio': False,
+    'format': None,
+    'quality': 'best',
+    'output': None,
+    'no_meta': False,
+    'no_thumb': False,
+    'subs': False,
+    'sponsor': False,
+    'geo': False,
+    'reverse': False,
+    'force_ffmpeg': False,
+    'cookies_browser': None,
+    'cookies_file': None,
+}
+
+
+def parse_args(argv=None):
+    """
+    Parse CLI arguments.
+    
+    A lone URL argument is handled without building the argparse parser;
+    everything else (flags, ``--help``, no arguments) goes through it.
+    
+    Args:
+        argv (list, optional): Arguments to parse. Defaults to sys.argv[1:].
+        
+    Returns:
+        Namespace with the parsed arguments
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    if len(argv) == 1 and not argv[0].startswith('-'):
+        return SimpleNamespace(url=argv[0], **_URL_ONLY_DEFAULTS)
+    return setup_parser().parse_args(argv)
+
+
+_BAR_LEN = 30
+# Every possible bar, indexed by the number of filled cells
+_BARS = tuple('█' * i + '-' * (_BAR_LEN - i) for i in range(_BAR_LEN + 1))
+# Redraw at most every 50 ms unless progress moved by 0.5% or finished
+_MIN_INTERVAL = 0.05
+_MIN_STEP = 0.5
+_LAST = [0.0, -1.0]  # time, pct
+_PROG_FMT = "\r[{}] {:.1f}% | {:<40.40}".format
+
+
 def cli_progress(pct, msg):
-    """Display CLI progress bar."""
-    bar_len = 30
-    filled = int(pct / 100 * bar_len)
-    bar = '█' * filled + '-' * (bar_len - filled)
-    sys.stdout.write(f"\r[{bar}] {pct:.1f}% | {msg[:40].ljust(40)}")
+    """Display CLI progress bar (throttled; completion is always drawn)."""
+    now = time.monotonic()
+    if now - _LAST[0] < _MIN_INTERVAL and abs(pct - _LAST[1]) < _MIN_STEP and pct < 100.0:
+        return
+    _LAST[0], _LAST[1] = now, pct
+    
+    filled = min(max(int(pct * _BAR_LEN / 100), 0), _BAR_LEN)
+    sys.stdout.write(_PROG_FMT(_BARS[filled], pct, msg))
     sys.stdout.flush()
 
 
-def cli_log(msg):
-    """Log message in CLI mode."""
-    print(f"\n[LOG] {msg}")
+def cli_log(msg, out=None):
+    """Log message in CLI mode (to ``out``, defaulting to stdout)."""
+    print(f"\n[LOG] {msg}", file=out)
 
 
 def run_cli(args):
     """Execute CLI mode."""
+    # Imported here so --help and argument errors never load the engine
+    from ytp3.core.engine import YTP3Engine
+    from ytp3.core.cache import default_cache_dir
+    from ytp3.utils.system import SystemDoctor, PathManager
+    
     print("\n--- YTP3Downloader [CLI MODE] ---\n")
     
     # Setup output path
-    save_path = args.output if args.output else PathManager.get_default_path()
-    if not os.path.exists(save_path):
-        os.makedirs(save_path)
+    if args.output:
+        save_path = args.output
+        os.makedirs(save_path, exist_ok=True)
+    else:
+        # Already created (once per working directory) by PathManager
+        save_path = PathManager.get_default_path()
     
     print(f"[INFO] Output: {save_path}")
     
-    # Run diagnostics
-    doctor = SystemDoctor()
+    # Run diagnostics (reused from recent runs while still valid)
+    doctor = SystemDoctor(cache_file=os.path.join(default_cache_dir(), "caps.json"))
     caps = doctor.run_diagnostics(save_path)
     
     missing = doctor.get_missing_criticals()
     if missing:
         print(f"[WARN] Missing Criticals: {', '.join(missing)}")
     
-    # Build download options
-    opts = {
-        'outtmpl': os.path.join(save_path, '%(playlist_index)s - %(title)s.%(ext)s'),
-        'ignoreerrors': True,
-        'add_metadata': not args.no_meta,
-        'writesubtitles': args.subs,
-        'geo_bypass': args.geo,
-        'playlistreverse': args.reverse,
-        'format_quality': args.quality,  # Pass quality to engine
-        'progress_hooks': [],
-        'logger': None,
-    }
-    
-    # Handle authentication
-    if args.cookies_browser:
-        opts['cookiesfrombrowser'] = (args.cookies_browser, None, None, None)
-    if args.cookies_file:
-        opts['cookiefile'] = args.cookies_file
-    
     # Handle format
     if args.audio:
         fmt = args.format or 'mp3'
         print(f"[AUDIO] Mode ({fmt})")
         
-        # Audio extraction with codec selection
-        audio_codec_map = {
-            'mp3': 'libmp3lame',
-            'wav': 'pcm_s16le',
-            'm4a': 'aac',
-            'aac': 'aac',
-            'opus': 'libopus',
-            'vorbis': 'libvorbis',
-        }
-        
-        preferred_codec = audio_codec_map.get(fmt.lower(), fmt)
-        
-        opts.update({
+        format_opts = {
             'format': 'bestaudio/best',
-            'postprocessors': [{
-                'key': 'FFmpegExtractAudio',
-                'preferredcodec': fmt,
-                'preferredquality': '192' if fmt.lower() in ['mp3', 'vorbis', 'opus', 'aac'] else 'best',
-                'nopostoverwrites': False,
-            }],
-            'postprocessor_args': ['-q:a', '0', '-threads', '4'],
+            'postprocessor_args': {'extractaudio': ['-q:a', '0', '-threads', '4']},
             'keep_video': False,
-        })
+        }
+        postprocessors = [{
+            'key': 'FFmpegExtractAudio',
+            'preferredcodec': fmt,
+            'preferredquality': '192' if fmt.lower() in ('mp3', 'vorbis', 'opus', 'aac') else 'best',
+            'nopostoverwrites': False,
+        }]
     else:
         fmt = args.format or 'mp4'
-        quality = args.quality
-        print(f"[VIDEO] Mode ({fmt}) | Quality: {quality}")
+        print(f"[VIDEO] Mode ({fmt}) | Quality: {args.quality}")
         
         # Engine handles format selection with fallbacks via FORMAT_FALLBACKS
         # Just set a base format and let engine manage degradation
-        opts.update({
+        format_opts = {
             'format': 'bestvideo+bestaudio/best',
             'merge_output_format': fmt,
-            'format_quality': quality,
+            # Critical merge settings
+            'prefer_ffmpeg': True,
+            'postprocessor_args': {'merger': ['-c:v', 'copy', '-c:a', 'aac', '-loglevel', 'verbose']},
+        }
+        postprocessors = []
+    
+    # Thumbnail embedding disabled to ensure reliable downloads
+    
+    # Add metadata (but allow failures)
+    if not args.no_meta:
+        postprocessors.append({
+            'key': 'FFmpegMetadata',
+            'add_chapters': False
         })
-        
-        # Critical merge settings
-        opts['prefer_ffmpeg'] = True
-        opts['postprocessor_args'] = ['-c:v', 'copy', '-c:a', 'aac', '-loglevel', 'verbose']
     
     # Handle SponsorBlock (works in both audio and video modes)
     if args.sponsor:
         if args.audio:
             # Audio mode: mark for video-first workflow
-            opts['sponsorblock_remove'] = 'all'
-            opts['sponsorblock_audio_workaround'] = True
             cli_log("[SPONSOR] SponsorBlock requested with audio extraction — engine will use video-first workflow")
         else:
             # Video mode: direct removal
-            opts['sponsorblock_remove'] = 'all'
             cli_log("[SPONSOR] SponsorBlock enabled - removing sponsor segments")
     
-    # Add postprocessors
-    if 'postprocessors' not in opts:
-        opts['postprocessors'] = []
-    
-    # Thumbnail embedding disabled to ensure reliable downloads
-    
-    # Add metadata (but allow failures)
-    if not args.no_meta:
-        opts['postprocessors'].append({
-            'key': 'FFmpegMetadata',
-            'add_chapters': False
-        })
+    # Build download options in one go
+    opts = {
+        'outtmpl': os.path.join(save_path, '%(playlist_index)s - %(title)s.%(ext)s'),
+        'ignoreerrors': True,
+        'add_metadata': not args.no_meta,
+        'writesubtitles': args.subs,
+        'geo_bypass': args.geo,
+        'playlistreverse': args.reverse,
+        'format_quality': args.quality,  # Pass quality to engine
+        'progress_hooks': [],
+        'logger': None,
+        'postprocessors': postprocessors,
+        **format_opts,
+        # Handle authentication
+        **({'cookiesfrombrowser': (args.cookies_browser, None, None, None)} if args.cookies_browser else {}),
+        **({'cookiefile': args.cookies_file} if args.cookies_file else {}),
+        **({'sponsorblock_remove': 'all'} if args.sponsor else {}),
+        **({'sponsorblock_audio_workaround': True} if args.sponsor and args.audio else {}),
+    }
     
     # Download
-    engine = YTP3Engine(opts, caps, log_callback=cli_log)
+    # The CLI shows everything, including tracebacks of failed attempts
+    engine = YTP3Engine(opts, caps, log_callback=cli_log, log_level=logging.DEBUG)
     
     print(f"\n[INFO] Processing: {args.url}")
     print(f"[CONFIG] Mode: VIDEO | Format: {args.format or 'mp4'} | Quality: {args.quality}")
@@ -191,13 +234,12 @@ def run_cli(args):
 
 def main():
     """Main CLI entry point."""
-    parser = setup_parser()
-    args = parser.parse_args()
+    args = parse_args()
     
     if args.url:
         run_cli(args)
     else:
-        parser.print_help()
+        setup_parser().print_help()
         sys.exit(1)
 
 
@@ -1,5 +1,6 @@
 """Core download engine and strategy management."""
 
 from .engine import YTP3Engine
+from .cache import MetadataCache
 
-__all__ = ["YTP3Engine"]
+__all__ = ["YTP3Engine", "MetadataCache"]
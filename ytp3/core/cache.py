@@ -0,0 +1,202 @@
+"""Disk-backed cache of resolved video metadata."""
+
+import os
+import re
+import copy
+import json
+import zlib
+import time
+import sqlite3
+import platform
+import threading
+from collections import OrderedDict
+from contextlib import closing
+
+
+# YouTube video IDs are 11 URL-safe base64 characters
+_VIDEO_ID_RE = re.compile(r'(?:[?&]v=|youtu\.be/|/shorts/|/embed/|/live/)([\w-]{11})')
+
+
+def cache_key(url):
+    """
+    Get the cache key for a URL.
+
+    Single videos are keyed by video ID so that different URL forms share an
+    entry; playlists and unrecognised URLs are keyed by the URL itself.
+
+    Args:
+        url (str): YouTube URL
+
+    Returns:
+        str: Cache key
+    """
+    if 'list=' not in url:
+        match = _VIDEO_ID_RE.search(url)
+        if match:
+            return match.group(1)
+    return url
+
+
+def _entry_key(url, auth):
+    """Get the storage key for a URL fetched with the given authentication fingerprint."""
+    key = cache_key(url)
+    return f"{key}#{auth}" if auth else key
+
+
+def default_cache_dir():
+    """Get the per-user cache directory for YTP3Downloader."""
+    if platform.system() == "Windows":
+        base = os.getenv('LOCALAPPDATA') or os.path.expanduser("~")
+    else:
+        base = os.getenv('XDG_CACHE_HOME') or os.path.expanduser("~/.cache")
+    return os.path.join(base, "YTP3Downloader")
+
+
+def default_cache_path():
+    """Get the default location of the metadata cache database."""
+    return os.path.join(default_cache_dir(), "metadata.sqlite3")
+
+
+class MetadataCache:
+    """SQLite-backed store of resolved metadata entries with a TTL.
+
+    Recently used entries are also kept in memory, so repeated lookups within
+    a session skip the database.
+    """
+
+    # Stream URLs inside format lists expire after a few hours
+    DEFAULT_TTL = 3600
+    # Oldest entries beyond this count are pruned on insert
+    DEFAULT_MAX_ENTRIES = 500
+    # Entries kept in the in-memory LRU in front of the database
+    MEMORY_ENTRIES = 128
+
+    def __init__(self, path=None, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        """
+        Initialize the metadata cache.
+
+        Args:
+            path (str, optional): Database file. Defaults to the user cache directory.
+            ttl (int): Seconds an entry stays valid
+            max_entries (int): Maximum number of entries kept on disk
+        """
+        self.path = path or default_cache_path()
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._memory = OrderedDict()  # key -> (ts, entries), least recent first
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with closing(self._connect()) as db, db:
+            # WAL lets readers proceed while another thread is writing
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS metadata "
+                "(key TEXT PRIMARY KEY, json BLOB NOT NULL, ts INTEGER NOT NULL)"
+            )
+
+    def _connect(self):
+        """Open a connection; one per operation keeps the cache thread-safe."""
+        db = sqlite3.connect(self.path, timeout=5)
+        # A lost entry after a power cut only costs a re-extraction
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def _remember(self, key, ts, entries):
+        """Store entries in the in-memory LRU, evicting the least recent."""
+        with self._lock:
+            self._memory[key] = (ts, entries)
+            self._memory.move_to_end(key)
+            if len(self._memory) > self.MEMORY_ENTRIES:
+                self._memory.popitem(last=False)
+
+    def get(self, url, auth=None):
+        """
+        Get cached entries for a URL.
+
+        Args:
+            url (str): YouTube URL
+            auth (str, optional): Fingerprint of the cookies the entries were fetched with
+
+        Returns:
+            list: Cached metadata entries (a private copy), or None if missing or expired
+        """
+        key = _entry_key(url, auth)
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit is not None:
+                if time.time() - hit[0] < self.ttl:
+                    self._memory.move_to_end(key)
+                    return copy.deepcopy(hit[1])
+                del self._memory[key]
+        
+        try:
+            with closing(self._connect()) as db:
+                row = db.execute(
+                    "SELECT json, ts FROM metadata WHERE key = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+
+        if row is None or time.time() - row[1] >= self.ttl:
+            return None
+        
+        payload = row[0]
+        try:
+            # Entries written before compression was added are plain JSON text
+            if isinstance(payload, bytes):
+                payload = zlib.decompress(payload)
+            entries = json.loads(payload)
+        except (zlib.error, ValueError):
+            return None
+        
+        self._remember(key, row[1], entries)
+        return copy.deepcopy(entries)
+
+    def put(self, url, entries, auth=None):
+        """
+        Store metadata entries for a URL.
+
+        Args:
+            url (str): YouTube URL
+            entries (list): JSON-serializable metadata entries
+            auth (str, optional): Fingerprint of the cookies the entries were fetched with
+        """
+        key = _entry_key(url, auth)
+        ts = int(time.time())
+        payload = json.dumps(entries)
+        # Keep a parsed copy so later edits by the caller cannot leak in
+        self._remember(key, ts, json.loads(payload))
+        try:
+            with closing(self._connect()) as db, db:
+                db.execute(
+                    "INSERT OR REPLACE INTO metadata (key, json, ts) VALUES (?, ?, ?)",
+                    (key, zlib.compress(payload.encode("utf-8")), ts),
+                )
+                db.execute(
+                    "DELETE FROM metadata WHERE key IN "
+                    "(SELECT key FROM metadata ORDER BY ts DESC, rowid DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+        except sqlite3.Error:
+            pass
+
+    def invalidate(self, url, auth=None):
+        """Drop the cached entries for a URL fetched with the given cookies."""
+        key = _entry_key(url, auth)
+        with self._lock:
+            self._memory.pop(key, None)
+        try:
+            with closing(self._connect()) as db, db:
+                db.execute("DELETE FROM metadata WHERE key = ?", (key,))
+        except sqlite3.Error:
+            pass
+
+    def clear(self):
+        """Drop every cached entry."""
+        with self._lock:
+            self._memory.clear()
+        try:
+            with closing(self._connect()) as db, db:
+                db.execute("DELETE FROM metadata")
+        except sqlite3.Error:
+            pass
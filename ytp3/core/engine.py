@@ -1,57 +1,230 @@
 """Core download engine for YTP3Downloader."""
 
+import copy
 import time
 import random
 import traceback
 import logging
 import re
 import os
+import json
+import hashlib
 import subprocess
-from io import StringIO
+import threading
+import concurrent.futures
+from collections import deque
+from types import MappingProxyType
 from .strategies import DownloadStrategy
+from .cache import cache_key, default_cache_dir
+from .ratelimit import TokenBucket
 
-try:
-    import yt_dlp
-except ImportError:
-    raise ImportError("yt-dlp is required. Install with: pip install yt-dlp")
+
+def _load_yt_dlp():
+    """Import yt-dlp on first use so importing the engine stays cheap."""
+    try:
+        import yt_dlp
+    except ImportError:
+        raise ImportError("yt-dlp is required. Install with: pip install yt-dlp")
+    return yt_dlp
+
+
+_SELECTOR_TOKEN_RE = re.compile(r'ext=(\w+)|height<=(\d+)')
+
+
+def _selector_tokens(selector):
+    """Extract the container/height tokens (e.g. 'mp4', '1080') from a format selector."""
+    return frozenset(ext or height for ext, height in _SELECTOR_TOKEN_RE.findall(selector))
+
+
+def _auth_fingerprint(auth_opts):
+    """
+    Fingerprint the cookie options metadata was fetched with.
+    
+    The cookie file's modification time is included, so replacing its
+    contents also changes the fingerprint.
+    
+    Args:
+        auth_opts (dict): The engine's ``cookiefile``/``cookiesfrombrowser`` options
+        
+    Returns:
+        str: Short hex digest, or "" when no cookies are used
+    """
+    if not any(auth_opts.values()):
+        return ""
+    state = dict(auth_opts)
+    cookie_file = auth_opts.get('cookiefile')
+    if cookie_file:
+        try:
+            state['cookiefile_mtime'] = os.path.getmtime(cookie_file)
+        except OSError:
+            pass
+    raw = json.dumps(state, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+_ANSI_RE = re.compile(r'\x1b\[[0-9;]*m')
+
+# FFmpeg arguments for merging only (they would break audio extraction); kept
+# a list because yt-dlp concatenates it with lists
+_MERGE_PP_ARGS = ['-c:v', 'copy', '-c:a', 'aac', '-loglevel', 'verbose']
+
+# FFmpeg encoder for each audio format of the video-first audio workflow
+_FFMPEG_AUDIO_CODECS = {
+    'mp3': 'libmp3lame',
+    'wav': 'pcm_s16le',
+    'm4a': 'aac',
+    'aac': 'aac',
+    'opus': 'libopus',
+    'vorbis': 'libvorbis',
+}
+
+
+def _format_bytes(n):
+    """Format a byte count with binary units, e.g. 1536 -> '1.50KiB'."""
+    for unit in ('B', 'KiB', 'MiB', 'GiB'):
+        if n < 1024:
+            return f"{n:.2f}{unit}"
+        n /= 1024
+    return f"{n:.2f}TiB"
+
+
+class _ProgressHook:
+    """yt-dlp progress hook forwarding events to ``progress_callback(pct, msg)``."""
+    
+    __slots__ = ("callback", "last_ts")
+    
+    # Download ticks are forwarded at most this often (seconds)
+    MIN_INTERVAL = 0.1
+    
+    def __init__(self, progress_callback):
+        self.callback = progress_callback
+        self.last_ts = float("-inf")
+    
+    @staticmethod
+    def _parse_percent(p):
+        """Parse yt-dlp's '_percent_str' (possibly ANSI-colored); None if not numeric."""
+        p = p or ''
+        # Strip ANSI color codes (\x1b[...m) from progress string
+        if '\x1b' in p:
+            p = _ANSI_RE.sub('', p)
+        p = p.strip(' \t%')
+        
+        # Skip placeholders such as 'N/A' without raising
+        if not p or not p[0].isdigit():
+            return None
+        try:
+            return float(p)
+        except ValueError:
+            return None
+    
+    def __call__(self, d):
+        status = d['status']
+        if status == 'downloading':
+            now = time.monotonic()
+            if now - self.last_ts < self.MIN_INTERVAL:
+                return
+            
+            get = d.get
+            total = get('total_bytes') or get('total_bytes_estimate')
+            done = get('downloaded_bytes')
+            if total and done is not None:
+                pct = done * 100.0 / total
+            else:
+                # Size unknown (e.g. fragmented streams): use yt-dlp's own estimate
+                pct = self._parse_percent(get('_percent_str', '0%'))
+                if pct is None:
+                    return
+            
+            speed = get('speed')
+            speed = f"{_format_bytes(speed)}/s" if speed else get('_speed_str', 'N/A')
+            eta = get('eta')
+            eta = f"{int(eta) // 60:02d}:{int(eta) % 60:02d}" if eta is not None else get('_eta_str', '?')
+            size = (_format_bytes(total) if total
+                    else get('_total_bytes_str') or get('_total_bytes_estimate_str') or '?')
+            self.callback(pct, f"[DOWNLOADING] {speed} | ETA: {eta} | {size}")
+            self.last_ts = now
+        elif status == 'finished':
+            self.callback(95.0, "[POST-PROCESSING] Merging audio/video...")
+        elif status == 'postprocessing':
+            self.callback(98.0, "[POST-PROCESSING] Finalizing format conversion...")
+
+
+# Error categories in priority order, checked one by one so a message matching
+# several (e.g. "403" and "429") is classified the same whatever its wording:
+# 'rate' waits and retries, 'cookie' and 'gone' abort, 'audio' moves to the
+# next strategy, 'strategy' errors persist across formats, 'format' errors may not
+_ERROR_PATTERNS = (
+    ('rate', re.compile(r'(?i:rate-limited)|429')),
+    ('cookie', re.compile(r'Netscape format')),
+    ('gone', re.compile(r'Private video|This video has been removed'
+                        r'|account associated with this video has been terminated')),
+    ('audio', re.compile(r'exit code -22|(?i:audio conversion failed)')),
+    ('strategy', re.compile(r'HTTP Error 403|Sign in to confirm|geo|Signatures')),
+    ('format', re.compile(r'Requested format')),
+)
+
+
+def _classify_error(msg):
+    """Return 'rate', 'cookie', 'gone', 'audio', 'strategy', 'format' or None for an error message."""
+    for category, pattern in _ERROR_PATTERNS:
+        if pattern.search(msg):
+            return category
+    return None
 
 
 class YTP3Engine:
     """Main download engine handling metadata resolution and downloads."""
     
-    # Format fallback hierarchy (5-layer degradation strategy)
+    __slots__ = ("opts", "caps", "log_cb", "strategies", "last_detailed_error", "metadata_cache",
+                 "_strategy_opts", "rate_limiter", "log_level", "_stop_event", "_rl_attempts",
+                 "_preferred_strategy", "_metadata_base", "_auth_key",
+                 "_inflight", "_inflight_lock")
+    
+    # Format fallback hierarchy (5-layer degradation strategy).
+    # Read-only reference data: shared by all instances, never copied.
     FORMAT_FALLBACKS = {
-        'best': [
+        'best': (
             ('bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best', 'Best quality with merged audio'),
             ('bestvideo+bestaudio/best', 'Auto-select best video+audio'),
             ('bestvideo[height<=1080]+bestaudio/best', 'Best quality up to 1080p'),
             ('best[ext=mp4]', 'Single best MP4 format'),
             ('best', 'Fallback to absolute best available'),
-        ],
-        'high': [
+        ),
+        'high': (
             ('(bestvideo[height<=1080][ext=mp4]/best[height<=1080][ext=mp4])+(bestaudio[ext=m4a]/best)', '1080p with merged audio'),
             ('(bestvideo[height<=1080]/best[height<=1080])+bestaudio/best', '1080p video+audio'),
             ('best[height<=1080][ext=mp4]', 'Best 1080p MP4'),
             ('best[height<=720]', 'Fallback to 720p'),
             ('best', 'Fallback to best available'),
-        ],
-        'medium': [
+        ),
+        'medium': (
             ('(bestvideo[height<=720][ext=mp4]/best[height<=720][ext=mp4])+(bestaudio[ext=m4a]/best)', '720p with merged audio'),
             ('(bestvideo[height<=720]/best[height<=720])+bestaudio/best', '720p video+audio'),
             ('best[height<=720][ext=mp4]', 'Best 720p MP4'),
             ('best[height<=480]', 'Fallback to 480p'),
             ('best', 'Fallback to best available'),
-        ],
-        'low': [
+        ),
+        'low': (
             ('(bestvideo[height<=480][ext=mp4]/best[height<=480][ext=mp4])+(bestaudio[ext=m4a]/best)', '480p with merged audio'),
             ('(bestvideo[height<=480]/best[height<=480])+bestaudio/best', '480p video+audio'),
             ('best[height<=480][ext=mp4]', 'Best 480p MP4'),
             ('worst[ext=mp4]', 'Worst quality MP4'),
             ('best', 'Fallback to best available'),
-        ]
+        ),
+    }
+    
+    # Tokens targeted by each quality's primary (layer 1) selector, computed once
+    FORMAT_FALLBACK_TOKENS = {
+        quality: _selector_tokens(fallbacks[0][0])
+        for quality, fallbacks in FORMAT_FALLBACKS.items()
     }
     
-    def __init__(self, options, capabilities, log_callback=None):
+    # Rate-limit backoff: RATE_LIMIT_BASE * 2**n seconds (plus jitter), capped
+    RATE_LIMIT_BASE = 30
+    RATE_LIMIT_MAX = 300
+    
+    def __init__(self, options, capabilities, log_callback=None, metadata_cache=None,
+                 log_level=logging.INFO):
         """
         Initialize the download engine.
         
@@ -59,12 +232,149 @@ class YTP3Engine:
             options (dict): yt-dlp download options
             capabilities (dict): System capabilities report
             log_callback (callable, optional): Callback function for logging
+            metadata_cache (MetadataCache, optional): Store for resolved metadata,
+                reused by later resolve/download calls for the same URL
+            log_level (int): ``logging`` level; expensive debug output such as
+                tracebacks is only built at DEBUG
         """
         self.opts = options
         self.caps = capabilities
         self.log_cb = log_callback
         self.strategies = DownloadStrategy.get_all()
         self.last_detailed_error = ""
+        self.metadata_cache = metadata_cache
+        self.log_level = log_level
+        # Download options per strategy, built once and never mutated
+        self._strategy_opts = tuple(self._build_strategy_opts(s) for s in self.strategies)
+        # Downloads in progress by cache key, so duplicate requests join them
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        # Strategy-independent metadata options, including preserved authentication
+        self._metadata_base = {
+            **self.BASE_METADATA_OPTS,
+            'cachedir': self.opts.get('cachedir', self._ytdlp_cache_dir()),
+            **{key: self.opts[key] for key in self.AUTH_OPTION_KEYS if key in self.opts},
+        }
+        # Cached metadata is kept per set of cookies, since they change what resolves
+        self._auth_key = _auth_fingerprint(
+            {key: self.opts[key] for key in self.AUTH_OPTION_KEYS if key in self.opts})
+        # Shared by every download on this engine, including concurrent ones
+        self.rate_limiter = TokenBucket(rate=self.REQUEST_RATE, capacity=self.REQUEST_BURST)
+        # Set by cancel(); interrupts pacing and rate-limit waits
+        self._stop_event = threading.Event()
+        # Consecutive rate-limit hits since the last successful download
+        self._rl_attempts = 0
+        # Index of the strategy that last succeeded; tried first next time,
+        # since items of one playlist usually need the same bypass
+        self._preferred_strategy = 0
+
+    def cancel(self):
+        """Cancel pending downloads, waking any pacing or rate-limit wait."""
+        self._stop_event.set()
+
+    def _wait(self, seconds):
+        """
+        Sleep for ``seconds`` unless the engine is cancelled first.
+        
+        Raises:
+            Exception: If the engine was cancelled
+        """
+        if self._stop_event.wait(seconds):
+            self.last_detailed_error = "Download cancelled"
+            raise Exception(self.last_detailed_error)
+
+    def _raise_if_cancelled(self, d):
+        """yt-dlp progress hook aborting the transfer once cancel() was called."""
+        if self._stop_event.is_set():
+            self.last_detailed_error = "Download cancelled"
+            raise Exception(self.last_detailed_error)
+
+    @staticmethod
+    def _ytdlp_cache_dir():
+        """Get the directory yt-dlp should use for its on-disk cache."""
+        return os.path.join(default_cache_dir(), "yt-dlp")
+
+    def _scoped_postprocessor_args(self):
+        """
+        Key postprocessor arguments by postprocessor.
+        
+        The stream-copy merge arguments only reach the merger; a bare list from
+        the caller is treated as audio-extraction arguments, its only use.
+        
+        Returns:
+            dict: yt-dlp ``postprocessor_args`` in its per-postprocessor form
+        """
+        user_args = self.opts.get('postprocessor_args')
+        if isinstance(user_args, dict):
+            return {'merger': _MERGE_PP_ARGS, **user_args}
+        if user_args:
+            return {'merger': _MERGE_PP_ARGS, 'extractaudio': list(user_args)}
+        return {'merger': _MERGE_PP_ARGS}
+
+    def _build_strategy_opts(self, strategy):
+        """
+        Build the attempt-independent download options for a strategy.
+        
+        Args:
+            strategy (Mapping): Strategy definition
+            
+        Returns:
+            dict: Options shared by every attempt with this strategy
+        """
+        return {
+            # Keep yt-dlp's player/signature cache in a stable location
+            'cachedir': self._ytdlp_cache_dir(),
+            **self.opts,
+            **strategy['extra'],
+            # Critical merge settings
+            'prefer_ffmpeg': True,
+            'postprocessor_args': self._scoped_postprocessor_args(),
+            'max_sleep_interval': 10,
+            # Silence warnings but keep errors
+            'quiet': False,
+            'no_warnings': False,
+        }
+
+    # Downloads may start in bursts of REQUEST_BURST, then REQUEST_RATE per second
+    REQUEST_RATE = 0.5
+    REQUEST_BURST = 3
+    
+    # Metadata strategies raced at once, and the delay between their starts
+    METADATA_WORKERS = 3
+    METADATA_STAGGER = 2.0
+    # Options of every metadata-only extraction
+    BASE_METADATA_OPTS = MappingProxyType({'quiet': True, 'ignoreerrors': True, 'logger': None})
+    AUTH_OPTION_KEYS = ('cookiesfrombrowser', 'cookiefile')
+    # Concurrent extractors used to hydrate flat playlist entries
+    HYDRATE_WORKERS = 4
+    # Trailing FFmpeg stderr lines logged when the video-first extraction fails
+    FFMPEG_ERROR_LINES = 50
+    
+    # Option keys any strategy may set; cleared when switching strategies
+    STRATEGY_OPTION_KEYS = frozenset(
+        key for strategy in DownloadStrategy.get_all() for key in strategy['extra']
+    )
+    
+    def _retarget_downloader(self, ydl, opts, selectors):
+        """
+        Point an existing YoutubeDL at the options of the next attempt.
+        
+        Args:
+            ydl (YoutubeDL): Downloader created for an earlier attempt
+            opts (dict): Full options for this attempt
+            selectors (dict): Format string -> selector compiled by ``ydl``
+        """
+        for key in self.STRATEGY_OPTION_KEYS - opts.keys():
+            ydl.params.pop(key, None)
+        ydl.params.update(opts)
+        
+        # The selector is compiled when the downloader is created; compile
+        # each fallback string at most once per downloader after that
+        fmt = opts['format']
+        selector = selectors.get(fmt)
+        if selector is None:
+            selector = selectors[fmt] = ydl.build_format_selector(fmt)
+        ydl.format_selector = selector
 
     def log(self, msg):
         """Log a message using callback or print."""
@@ -73,12 +383,24 @@ class YTP3Engine:
         else:
             print(msg)
 
-    def resolve_metadata(self, url):
+    def log_debug(self, make_msg):
+        """
+        Log a debug message that is costly to build.
+        
+        Args:
+            make_msg (callable): Returns the message; only called at DEBUG level
+        """
+        if self.log_level <= logging.DEBUG:
+            self.log(make_msg())
+
+    def resolve_metadata(self, url, hydrate=False):
         """
         Resolve video/playlist metadata with fallback strategies.
         
         Args:
             url (str): YouTube URL to analyze
+            hydrate (bool): Fully extract flat playlist entries (titles,
+                durations, ...) concurrently before returning
             
         Returns:
             list: List of video information dictionaries
@@ -86,66 +408,234 @@ class YTP3Engine:
         Raises:
             Exception: If metadata cannot be resolved after all strategies
         """
+        if self.metadata_cache is not None:
+            cached = self.metadata_cache.get(url, self._auth_key)
+            if cached:
+                self.log(f"[METADATA] Using cached metadata for {len(cached)} item(s)")
+                if hydrate and any(entry.get('_type') == 'url' for entry in cached):
+                    # Cached by a plain call: hydrate now and keep the result
+                    cached = self.hydrate_entries(cached)
+                    self.metadata_cache.put(url, [_load_yt_dlp().YoutubeDL.sanitize_info(r) for r in cached],
+                                            self._auth_key)
+                return cached
+        
+        yt_dlp = _load_yt_dlp()
         last_error = ""
         
-        for strategy in self.strategies:
-            p_opts = {
-                'quiet': True,
-                'ignoreerrors': True,
-                'extract_flat': 'in_playlist',
-                'logger': None
-            }
-            
-            # Preserve authentication options
-            if 'cookiesfrombrowser' in self.opts:
-                p_opts['cookiesfrombrowser'] = self.opts['cookiesfrombrowser']
-            if 'cookiefile' in self.opts:
-                p_opts['cookiefile'] = self.opts['cookiefile']
-            
-            p_opts.update(strategy['extra'])
-
-            try:
-                with yt_dlp.YoutubeDL(p_opts) as ydl:
-                    info = ydl.extract_info(url, download=False)
-                    results = []
+        # Strategies race with staggered starts; the first non-empty result
+        # wins and strategies that have not started yet are skipped
+        stop = threading.Event()
+        
+        def attempt(idx, strategy):
+            if idx and stop.wait(idx * self.METADATA_STAGGER):
+                return None
+            return self._resolve_with_strategy(yt_dlp, strategy, url)
+        
+        pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(self.METADATA_WORKERS, len(self.strategies)))
+        futures = {pool.submit(attempt, idx, strategy): strategy
+                   for idx, strategy in enumerate(self.strategies)}
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                strategy = futures[future]
+                try:
+                    results = future.result()
+                except Exception as e:
+                    error_msg = str(e)
                     
-                    # Handle playlists
-                    if 'entries' in info:
-                        for entry in info['entries']:
-                            if entry:
-                                results.append(entry)
-                    else:
-                        results.append(info)
+                    # Handle cookie format errors
+                    if "Netscape format" in error_msg:
+                        raise Exception("Invalid Cookie File. Must be Netscape format (not JSON).")
                     
-                    if results:
-                        self.log(f"[METADATA] Resolved {len(results)} item(s) using {strategy['name']} strategy")
-                        return results
-                        
-            except Exception as e:
-                error_msg = str(e)
-                
-                # Handle cookie format errors
-                if "Netscape format" in error_msg:
-                    raise Exception("Invalid Cookie File. Must be Netscape format (not JSON).")
-                
-                last_error = error_msg
-                self.log(f"[DEBUG] Metadata fetch with {strategy['name']}: {error_msg[:100]}")
-                
-                # Retry on signature/availability errors
-                if "Signatures" in error_msg or "not available" in error_msg:
-                    self.log(f"[RETRY] Trying next strategy...")
+                    last_error = error_msg
+                    self.log(f"[DEBUG] Metadata fetch with {strategy['name']}: {error_msg[:100]}")
+                    
+                    # Retry on signature/availability errors
+                    if "Signatures" in error_msg or "not available" in error_msg:
+                        self.log(f"[RETRY] Trying next strategy...")
+                    else:
+                        stop.set()
                     continue
-                else:
-                    break
+                
+                if results:
+                    self.log(f"[METADATA] Resolved {len(results)} item(s) using {strategy['name']} strategy")
+                    if hydrate:
+                        results = self.hydrate_entries(results, strategy)
+                    if self.metadata_cache is not None:
+                        self.metadata_cache.put(url, [yt_dlp.YoutubeDL.sanitize_info(r) for r in results],
+                                                self._auth_key)
+                    return results
+        finally:
+            stop.set()
+            # Do not wait for slower strategies once the outcome is known
+            # (cancelled by hand: shutdown(cancel_futures=) needs Python 3.9)
+            for future in futures:
+                future.cancel()
+            pool.shutdown(wait=False)
         
         msg = f"Metadata fetch failed after all attempts: {last_error}"
         self.last_detailed_error = msg
         raise Exception(msg)
 
+    def iter_metadata(self, url, strategy=None):
+        """
+        Yield metadata entries for a URL as yt-dlp produces them.
+        
+        Unlike resolve_metadata this uses a single strategy and skips the
+        cache, but playlist pages are fetched lazily, so callers can consume
+        entries before extraction finishes without holding them all at once.
+        
+        Args:
+            url (str): YouTube URL to analyze
+            strategy (Mapping, optional): Strategy to extract with. Defaults to the first.
+            
+        Yields:
+            dict: Video information dictionaries (flat entries for playlists)
+        """
+        yt_dlp = _load_yt_dlp()
+        p_opts = self._metadata_opts(strategy or self.strategies[0])
+        p_opts['extract_flat'] = 'in_playlist'
+        
+        with yt_dlp.YoutubeDL(p_opts) as ydl:
+            info = ydl.extract_info(url, download=False, process=False)
+            if not info:
+                return
+            if info.get('_type') in ('playlist', 'multi_video'):
+                for entry in info.get('entries') or ():
+                    if entry:
+                        yield entry
+            else:
+                yield ydl.process_ie_result(info, download=False)
+
+    def _metadata_opts(self, strategy):
+        """
+        Build yt-dlp options for metadata-only extraction with a strategy.
+        
+        Args:
+            strategy (Mapping): Strategy definition
+            
+        Returns:
+            dict: Fresh options dictionary owned by the caller
+        """
+        return {**self._metadata_base, **strategy['extra']}
+
+    def _resolve_with_strategy(self, yt_dlp, strategy, url):
+        """
+        Extract metadata for a URL using a single strategy.
+        
+        Args:
+            yt_dlp (module): The yt-dlp module
+            strategy (Mapping): Strategy definition
+            url (str): YouTube URL to analyze
+            
+        Returns:
+            list: Video information dictionaries (may be empty)
+        """
+        p_opts = self._metadata_opts(strategy)
+        p_opts['extract_flat'] = 'in_playlist'
+        
+        with yt_dlp.YoutubeDL(p_opts) as ydl:
+            info = ydl.extract_info(url, download=False)
+            
+            # Handle playlists
+            if 'entries' in info:
+                return [entry for entry in info['entries'] if entry]
+            return [info]
+
+    def hydrate_entries(self, entries, strategy=None, max_workers=None):
+        """
+        Fully extract flat playlist entries using concurrent extractors.
+        
+        Each worker thread owns its own YoutubeDL, since instances are not
+        thread-safe, and pulls the next pending entry until none are left.
+        Extractions share the engine's rate limiter with downloads.
+        
+        Args:
+            entries (list): Entries returned by resolve_metadata
+            strategy (Mapping, optional): Strategy to extract with. Defaults to the first.
+            max_workers (int, optional): Worker threads. Defaults to HYDRATE_WORKERS.
+            
+        Returns:
+            list: Entries in their original order; entries that are not flat
+                  references or fail to extract are returned unchanged
+        """
+        results = list(entries)
+        flat = [idx for idx, entry in enumerate(entries)
+                if entry.get('_type') == 'url' and entry.get('url')]
+        workers = min(max_workers or self.HYDRATE_WORKERS, len(flat))
+        if not workers:
+            return results
+        pending = iter(flat)
+        
+        yt_dlp = _load_yt_dlp()
+        p_opts = self._metadata_opts(strategy or self.strategies[0])
+        p_opts['skip_download'] = True
+        lock = threading.Lock()
+        
+        def work():
+            with yt_dlp.YoutubeDL(p_opts) as ydl:
+                while True:
+                    with lock:
+                        idx = next(pending, None)
+                    if idx is None:
+                        return
+                    target = entries[idx].get('webpage_url') or entries[idx]['url']
+                    # Each extraction is a request to YouTube; pace it like a download
+                    self.rate_limiter.acquire(self._wait)
+                    try:
+                        info = ydl.extract_info(target, download=False, process=False)
+                    except Exception as e:
+                        self.log(f"[DEBUG] Hydrating {target} failed: {str(e)[:100]}")
+                        continue
+                    if info:
+                        results[idx] = info
+        
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+            for future in [pool.submit(work) for _ in range(workers)]:
+                future.result()
+        
+        return results
+
+    def _validate_item(self, info):
+        """
+        Reject items that no download attempt could succeed on.
+        
+        ``max_filesize`` (a yt-dlp option) and ``max_duration`` (seconds) in
+        the engine options are enforced when the metadata reports them.
+        
+        Args:
+            info (dict): Metadata entry for the item
+            
+        Raises:
+            Exception: If the item is private or too large
+        """
+        reason = None
+        # Only 'private' is final: needs_auth/premium_only/subscriber_only
+        # items (e.g. age-restricted or members-only) download with cookies
+        if info.get('availability') == 'private':
+            reason = "Video is private"
+        else:
+            duration = info.get('duration')
+            max_duration = self.opts.get('max_duration')
+            if max_duration and duration and duration > max_duration:
+                reason = f"Video is longer than {max_duration}s ({duration:.0f}s)"
+            size = info.get('filesize_approx')
+            max_size = self.opts.get('max_filesize')
+            if max_size and size and size > max_size:
+                reason = f"Video is larger than {_format_bytes(max_size)} ({_format_bytes(size)})"
+        
+        if reason:
+            self.last_detailed_error = reason
+            self.log(f"[SKIP] {reason}")
+            raise Exception(reason)
+
     def download_single_item(self, url, progress_callback=None):
         """
         Download a single video with 5-layer degradation fallback.
         
+        A request for a video that this engine is already downloading (under
+        any URL form) waits for that download and shares its outcome.
+        
         Args:
             url (str): Video URL to download
             progress_callback (callable, optional): Callback for progress updates
@@ -153,13 +643,39 @@ class YTP3Engine:
         Raises:
             Exception: If download fails after all strategies and formats
         """
+        key = cache_key(url)
+        with self._inflight_lock:
+            running = self._inflight.get(key)
+            owner = running is None
+            if owner:
+                running = self._inflight[key] = concurrent.futures.Future()
+        
+        if not owner:
+            self.log(f"[QUEUE] Already downloading {url}; waiting for that download")
+            return running.result()
+        
+        try:
+            result = self._download_single_item(url, progress_callback)
+        except BaseException as e:
+            running.set_exception(e)
+            raise
+        else:
+            running.set_result(result)
+            return result
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+
+    def _download_single_item(self, url, progress_callback):
+        """Run the strategy/format attempts for download_single_item."""
+        yt_dlp = _load_yt_dlp()
         success = False
         last_error = ""
         attempt_count = 0
-        max_attempts = 20  # 5 strategies × 4 fallback formats
         
-        # Random delay to avoid rate limiting
-        time.sleep(random.uniform(0.5, 2.0))
+        # Pace downloads to avoid rate limiting; only waits once the burst
+        # budget is spent, so a lone download starts immediately
+        self.rate_limiter.acquire(self._wait)
         
         # Determine quality level
         quality = self.opts.get('format_quality', 'best')
@@ -167,59 +683,57 @@ class YTP3Engine:
         
         self.log(f"[DOWNLOAD] Starting download with quality: {quality}")
         self.log(f"[FORMAT] Available fallback formats: {len(fallback_formats)}")
+        
+        # Fully resolved single-video info lets yt-dlp skip re-extraction;
+        # it is dropped after the first failure so later attempts start fresh
+        cached_info = None
+        if self.metadata_cache is not None:
+            cached = self.metadata_cache.get(url, self._auth_key)
+            if cached and len(cached) == 1:
+                # Known-doomed items fail here instead of after every attempt
+                self._validate_item(cached[0])
+                if cached[0].get('formats'):
+                    cached_info = cached[0]
+                    self.log("[CACHE] Reusing resolved metadata")
 
-        for strategy in self.strategies:
-            if success:
-                break
-            
-            self.log(f"[STRATEGY] Attempting with {strategy['name']} bypass...")
-            
-            # Layer 1-5: Try each format fallback with this strategy
-            for fallback_idx, (fmt, fmt_desc) in enumerate(fallback_formats, 1):
-                if success:
-                    break
+        # Progress handler shared by every attempt
+        # The cancel check runs first so cancel() also interrupts a running transfer
+        progress_hooks = [self._raise_if_cancelled]
+        if progress_callback:
+            progress_hooks.append(_ProgressHook(progress_callback))
+        
+        ydl = None
+        selectors = {}
+        seen_errors = set()
+        # Every (strategy, format) attempt in order, the last successful
+        # strategy first; errors prune the attempts that are left
+        order = sorted(range(len(self.strategies)), key=lambda i: i != self._preferred_strategy)
+        schedule = deque((strategy_idx, fallback_idx, fmt, fmt_desc)
+                         for strategy_idx in order
+                         for fallback_idx, (fmt, fmt_desc) in enumerate(fallback_formats, 1))
+        current_strategy = None
+        try:
+            while schedule and not success:
+                strategy_idx, fallback_idx, fmt, fmt_desc = schedule.popleft()
+                strategy = self.strategies[strategy_idx]
+                base_opts = self._strategy_opts[strategy_idx]
+                if strategy_idx != current_strategy:
+                    current_strategy = strategy_idx
+                    self.log(f"[STRATEGY] Attempting with {strategy['name']} bypass...")
                 
+                self._wait(0)
                 attempt_count += 1
                 self.log(f"[ATTEMPT {attempt_count}] L{fallback_idx}: {fmt_desc}")
                 
                 try:
-                    current_opts = self.opts.copy()
-                    current_opts.update(strategy['extra'])
-                    
-                    # Critical merge settings
-                    current_opts['format'] = fmt
-                    current_opts['prefer_ffmpeg'] = True
-                    current_opts['postprocessor_args'] = ['-c:v', 'copy', '-c:a', 'aac', '-loglevel', 'verbose']
-                    
-                    # Rate-limiting
-                    current_opts['sleep_interval'] = random.randint(2, 5)
-                    current_opts['max_sleep_interval'] = 10
-                    
-                    # Silence warnings but keep errors
-                    current_opts['quiet'] = False
-                    current_opts['no_warnings'] = False
-                    
-                    # Progress callback handler
-                    def progress_hook(d):
-                        if d['status'] == 'downloading' and progress_callback:
-                            p = d.get('_percent_str', '0%').replace('%', '')
-                            try:
-                                # Strip ANSI color codes (\x1b[...m) from progress string
-                                p_clean = re.sub(r'\x1b\[[0-9;]*m', '', p).strip()
-                                pct = float(p_clean)
-                                speed = d.get('_speed_str', 'N/A')
-                                eta = d.get('_eta_str', '?')
-                                size = d.get('_total_bytes_str') or d.get('_total_bytes_estimate_str') or '?'
-                                msg = f"[DOWNLOADING] {speed} | ETA: {eta} | {size}"
-                                progress_callback(pct, msg)
-                            except Exception as pe:
-                                pass  # Silently ignore progress parsing errors
-                        elif d['status'] == 'finished' and progress_callback:
-                            progress_callback(95.0, "[POST-PROCESSING] Merging audio/video...")
-                        elif d['status'] == 'postprocessing' and progress_callback:
-                            progress_callback(98.0, "[POST-PROCESSING] Finalizing format conversion...")
-
-                    current_opts['progress_hooks'] = [progress_hook]
+                    # Only the per-attempt fields are set here; the rest is prebuilt
+                    current_opts = {
+                        **base_opts,
+                        'format': fmt,
+                        # Extra yt-dlp sleeps only while recovering from a rate limit
+                        'sleep_interval': random.randint(2, 5) if self._rl_attempts else 0,
+                        'progress_hooks': progress_hooks,
+                    }
                     
                     # Detect audio-extraction + SponsorBlock conflict
                     postpps = current_opts.get('postprocessors', []) or []
@@ -230,25 +744,31 @@ class YTP3Engine:
                         # Video-first workflow: download video with SponsorBlock applied, then extract audio from the resulting file
                         self.log("[AUDIO-FLOW] SponsorBlock requested with audio extraction — using video-first workflow")
 
-                        # Prepare video download options
-                        video_opts = current_opts.copy()
-                        # Remove audio-extraction postprocessor to keep video processing only
-                        v_pp = [pp for pp in video_opts.get('postprocessors', []) if not (isinstance(pp, dict) and pp.get('key') == 'FFmpegExtractAudio')]
-                        video_opts['postprocessors'] = v_pp
-                        # Force combined download and merging
-                        video_opts['format'] = 'bestvideo+bestaudio/best'
-                        video_opts['prefer_ffmpeg'] = True
-                        video_opts['merge_output_format'] = video_opts.get('merge_output_format', 'mp4')
-                        # Ensure we keep the merged video for subsequent audio extraction
-                        video_opts['keep_video'] = True
-
-                        with yt_dlp.YoutubeDL(video_opts) as ydl:
+                        # Prepare video download options as one override layer
+                        video_opts = {
+                            **current_opts,
+                            # Remove audio-extraction postprocessor to keep video processing only
+                            'postprocessors': [pp for pp in postpps if not (isinstance(pp, dict) and pp.get('key') == 'FFmpegExtractAudio')],
+                            # Force combined download and merging
+                            'format': 'bestvideo+bestaudio/best',
+                            'prefer_ffmpeg': True,
+                            'merge_output_format': current_opts.get('merge_output_format', 'mp4'),
+                            # Ensure we keep the merged video for subsequent audio extraction
+                            'keep_video': True,
+                        }
+
+                        # A separate downloader so the pooled one below is not
+                        # replaced; the with block closes it
+                        with yt_dlp.YoutubeDL(video_opts) as video_ydl:
                             self.log(f"[YT-DLP] (video-first) Downloading with format: {video_opts['format']}")
-                            info = ydl.extract_info(url, download=True)
+                            if cached_info is not None:
+                                info = video_ydl.process_ie_result(copy.deepcopy(cached_info), download=True)
+                            else:
+                                info = video_ydl.extract_info(url, download=True)
 
                             # Try to determine output filename
                             try:
-                                out_filename = ydl.prepare_filename(info)
+                                out_filename = video_ydl.prepare_filename(info)
                             except Exception:
                                 out_filename = None
 
@@ -260,29 +780,30 @@ class YTP3Engine:
                             if target_pp:
                                 preferredcodec = target_pp.get('preferredcodec', 'mp3')
 
-                            codec_map = {
-                                'mp3': 'libmp3lame',
-                                'wav': 'pcm_s16le',
-                                'm4a': 'aac',
-                                'aac': 'aac',
-                                'opus': 'libopus',
-                                'vorbis': 'libvorbis',
-                            }
-                            ff_codec = codec_map.get(preferredcodec.lower(), preferredcodec)
+                            ff_codec = _FFMPEG_AUDIO_CODECS.get(preferredcodec.lower(), preferredcodec)
 
                             # Build output filename
                             base, _ext = os.path.splitext(out_filename)
                             out_audio = f"{base}.{preferredcodec}"
 
+                            # Only errors reach stderr, so capturing it stays cheap
                             ff_cmd = [
-                                'ffmpeg', '-y', '-i', out_filename,
+                                'ffmpeg', '-nostdin', '-hide_banner', '-loglevel', 'error',
+                                '-y', '-i', out_filename,
                                 '-vn',
                                 '-c:a', ff_codec,
                                 out_audio
                             ]
 
                             try:
-                                subprocess.run(ff_cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                                proc = subprocess.run(ff_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                                      text=True, errors='replace')
+                                if proc.returncode != 0:
+                                    tail = proc.stderr.strip().splitlines()[-self.FFMPEG_ERROR_LINES:]
+                                    for line in tail:
+                                        self.log(f"[FFMPEG] {line}")
+                                    raise Exception(f"FFmpeg exited with code {proc.returncode}: "
+                                                    f"{tail[-1] if tail else 'no output'}")
                                 self.log(f"[AUDIO-FLOW] Extracted audio to {out_audio}")
                                 success = True
                                 if progress_callback:
@@ -298,10 +819,20 @@ class YTP3Engine:
                             self.log(f"[AUDIO-FLOW-ERROR] {last_error}")
                             continue
                     else:
-                        with yt_dlp.YoutubeDL(current_opts) as ydl:
-                            self.log(f"[YT-DLP] Downloading with format: {fmt}")
+                        # One downloader serves every attempt so its HTTP
+                        # connections and extractor state are reused
+                        if ydl is None:
+                            ydl = yt_dlp.YoutubeDL(current_opts)
+                            selectors[fmt] = ydl.format_selector
+                        else:
+                            self._retarget_downloader(ydl, current_opts, selectors)
+                        
+                        self.log(f"[YT-DLP] Downloading with format: {fmt}")
+                        if cached_info is not None:
+                            ydl.process_ie_result(copy.deepcopy(cached_info), download=True)
+                        else:
                             ydl.download([url])
-                            success = True
+                        success = True
 
                         self.log(f"[SUCCESS] Download completed with {strategy['name']} strategy, format L{fallback_idx}")
                         if progress_callback:
@@ -311,30 +842,66 @@ class YTP3Engine:
                     last_error = str(e)
                     error_brief = last_error[:150]
                     
+                    if cached_info is not None:
+                        # Stream URLs may have expired; re-extract from now on
+                        cached_info = None
+                        self.metadata_cache.invalidate(url, self._auth_key)
+                    
                     self.log(f"[FAILED L{fallback_idx}] {strategy['name']}: {error_brief}")
                     self.log(f"[DEBUG] Full error: {last_error}")
-                    self.log(f"[DEBUG] Traceback: {traceback.format_exc()}")
+                    # The same failure tends to repeat across attempts; its stack once is enough
+                    error_type = type(e).__name__
+                    signature = f"{error_type}: {last_error[:80]}"
+                    if signature in seen_errors:
+                        self.log_debug(lambda: f"[DEBUG] Repeat of an earlier error ({error_type})")
+                    else:
+                        seen_errors.add(signature)
+                        self.log_debug(lambda: f"[DEBUG] Traceback: {traceback.format_exc()}")
                     
                     # Handle specific errors
-                    if "rate-limited" in str(e).lower() or "429" in str(e):
+                    kind = _classify_error(last_error)
+                    if kind == 'rate':
+                        delay = (min(self.RATE_LIMIT_MAX, self.RATE_LIMIT_BASE * 2 ** self._rl_attempts)
+                                 + random.uniform(0, 5))
+                        self._rl_attempts += 1
                         if progress_callback:
-                            progress_callback(0, "[RATE-LIMITED] Cooling down 45s...")
-                        self.log(f"[RATE-LIMIT] Waiting 45 seconds...")
-                        time.sleep(45)
+                            progress_callback(0, f"[RATE-LIMITED] Cooling down {delay:.0f}s...")
+                        self.log(f"[RATE-LIMIT] Waiting {delay:.0f} seconds...")
+                        self._wait(delay)
                         continue
                     
-                    if "Netscape format" in str(e):
+                    if kind == 'cookie':
                         self.last_detailed_error = "Cookie file is invalid or corrupt. Must be Netscape format."
                         raise Exception(self.last_detailed_error)
                     
+                    # No strategy or format can bring back a private or removed video
+                    if kind == 'gone':
+                        self.last_detailed_error = f"Video cannot be downloaded: {error_brief}"
+                        raise Exception(self.last_detailed_error)
+                    
                     # Handle audio extraction failures
-                    if "exit code -22" in str(e) or "audio conversion failed" in str(e).lower():
+                    if kind == 'audio':
                         self.log(f"[AUDIO-ERROR] FFmpeg audio conversion failed")
                         self.log(f"[AUDIO-FIX] Try alternative format: -f wav or -f m4a")
                         # Continue to next strategy which may have different audio handling
                         continue
                     
+                    # Errors a different format cannot fix: skip to the next strategy
+                    if kind == 'strategy':
+                        self.log("[SKIP] Error is not format-related; trying next strategy")
+                        useful = DownloadStrategy.follow_ups(last_error)
+                        skipped = {self.strategies[step[0]]['name'] for step in schedule
+                                   if useful is not None and self.strategies[step[0]]['name'] not in useful}
+                        if skipped:
+                            self.log(f"[SKIP] {', '.join(sorted(skipped))} cannot fix the last error")
+                        schedule = deque(step for step in schedule
+                                         if step[0] != strategy_idx
+                                         and self.strategies[step[0]]['name'] not in skipped)
+                    
                     # Continue to next fallback format
+        finally:
+            if ydl is not None:
+                ydl.close()
         
         if not success:
             msg = f"Download exhausted all {attempt_count} format/strategy attempts. Last error: {last_error}"
@@ -342,4 +909,50 @@ class YTP3Engine:
             self.log(f"[FATAL] {msg}")
             raise Exception(msg)
         
+        self._rl_attempts = 0
+        self._preferred_strategy = strategy_idx
         return True
+
+    def download_playlist(self, urls, progress_callback=None, max_workers=None):
+        """
+        Download several items concurrently with a bounded worker pool.
+        
+        Each item runs through download_single_item with its own downloader;
+        per-item progress is not forwarded, only overall completion.
+        
+        Args:
+            urls (list): Video URLs to download
+            progress_callback (callable, optional): Called with overall
+                (percent, message) as items finish
+            max_workers (int, optional): Worker count. Defaults to the
+                'parallel' capability, or 6.
+            
+        Returns:
+            dict: URL -> None on success, or the error message on failure
+        """
+        urls = list(urls)
+        results = {}
+        if not urls:
+            return results
+        
+        workers = max(1, min(max_workers or self.caps.get('parallel', 6), len(urls)))
+        done = 0
+        
+        self.log(f"[PLAYLIST] Downloading {len(urls)} item(s) with {workers} worker(s)")
+        
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(self.download_single_item, url): url for url in urls}
+            for future in concurrent.futures.as_completed(futures):
+                url = futures[future]
+                try:
+                    future.result()
+                    results[url] = None
+                except Exception as e:
+                    results[url] = str(e)
+                
+                # Completions are collected on this thread, so no lock is needed
+                done += 1
+                if progress_callback:
+                    progress_callback(done * 100.0 / len(urls), f"[PLAYLIST] {done}/{len(urls)} item(s) finished")
+        
+        return results
@@ -0,0 +1,51 @@
+"""Request pacing shared by concurrent downloads."""
+
+import time
+import threading
+
+
+class TokenBucket:
+    """Thread-safe token bucket: allows bursts up to ``capacity``, then ``rate`` per second."""
+
+    def __init__(self, rate, capacity):
+        """
+        Initialize a full bucket.
+
+        Args:
+            rate (float): Tokens added per second
+            capacity (int): Maximum number of stored tokens (burst size)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        """
+        Take a token, borrowing against future refills if none is available.
+
+        Returns:
+            float: Seconds the caller must wait before its token is due
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self, wait=time.sleep):
+        """
+        Take a token, sleeping only if the burst budget is spent.
+
+        Args:
+            wait (callable): Function used to sleep for the given seconds
+
+        Returns:
+            float: Seconds waited
+        """
+        delay = self._reserve()
+        if delay > 0:
+            wait(delay)
+        return delay
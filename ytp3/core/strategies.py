@@ -1,10 +1,13 @@
 """Download strategy definitions for bypassing restrictions."""
 
+from types import MappingProxyType
+
 
 class DownloadStrategy:
     """Encapsulates a single download strategy with fallback options."""
     
-    STRATEGIES = [
+    # Built once at import; entries are read-only views shared by all callers
+    STRATEGIES = tuple(MappingProxyType(s) for s in [
         {
             "name": "Standard",
             "description": "Standard YouTube extraction",
@@ -25,11 +28,34 @@ class DownloadStrategy:
             "description": "Uses TV player client",
             "extra": {'extractor_args': {'youtube': {'player_client': ['tv']}}}
         }
-    ]
+    ])
+    
+    # Strategies worth trying after an error containing the key; others are skipped
+    FOLLOW_UPS = MappingProxyType({
+        # Only the alternative player clients avoid the web player's signature JS
+        "Signatures": frozenset({"Android Bypass", "iOS Bypass", "TV Bypass"}),
+        "confirm your age": frozenset({"TV Bypass"}),
+    })
+    
+    @classmethod
+    def follow_ups(cls, error_msg):
+        """
+        Get the strategies that may succeed after an error.
+        
+        Args:
+            error_msg (str): Error message of the failed attempt
+            
+        Returns:
+            frozenset: Names of useful strategies, or None if any strategy may help
+        """
+        for needle, names in cls.FOLLOW_UPS.items():
+            if needle in error_msg:
+                return names
+        return None
     
     @classmethod
     def get_all(cls):
-        """Get all available download strategies."""
+        """Get all available download strategies (cached, read-only)."""
         return cls.STRATEGIES
     
     @classmethod
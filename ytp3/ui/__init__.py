@@ -1,6 +1,6 @@
 """UI module with GUI components and application."""
 
 from .app import YTP3App, run_gui
-from .components import RetroProgressBar, VideoItemRow
+from .components import RetroProgressBar, VideoItemRow, QueueEntry, VirtualQueueList
 
-__all__ = ["YTP3App", "run_gui", "RetroProgressBar", "VideoItemRow"]
+__all__ = ["YTP3App", "run_gui", "RetroProgressBar", "VideoItemRow", "QueueEntry", "VirtualQueueList"]
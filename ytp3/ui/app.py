@@ -2,11 +2,11 @@
 
 import os
 import sys
+import copy
 import threading
 import concurrent.futures
-import random
-import time
 from io import BytesIO
+from collections import deque
 
 try:
     import customtkinter as ctk
@@ -15,8 +15,9 @@ try:
 except ImportError:
     raise ImportError("Required packages missing. Install with: pip install customtkinter pillow requests")
 
-from .components import RetroProgressBar, VideoItemRow
+from .components import RetroProgressBar, QueueEntry, VirtualQueueList
 from ytp3.core.engine import YTP3Engine
+from ytp3.core.cache import MetadataCache
 from ytp3.utils.system import ConfigManager, SystemDoctor, PathManager
 
 
@@ -27,9 +28,19 @@ class YTP3App(ctk.CTk):
     BG_GRAY = "#C0C0C0"
     NAVY = "#000080"
     
+    # Checkbox settings saved under "toggles"; each maps to the chk_<key> widget
+    TOGGLE_KEYS = ("meta", "thumb", "subs", "sponsor", "geo", "force_ffmpeg")
+    
     # Concurrency settings
     IMAGE_LOADER = concurrent.futures.ThreadPoolExecutor(max_workers=4)
     
+    # Queued log lines are written to the log box at most this often (ms)
+    LOG_FLUSH_MS = 100
+    # Oldest log lines are dropped beyond this many, keeping inserts cheap
+    LOG_MAX_LINES = 5000
+    # Queue totals are redrawn at most this often (ms) while downloads run
+    PROGRESS_PUMP_MS = 33
+    
     def __init__(self):
         """Initialize the application."""
         super().__init__()
@@ -44,6 +55,29 @@ class YTP3App(ctk.CTk):
         self.cfg = ConfigManager()
         self.caps = {}
         self.queue_items = []
+        # Engine of the running download queue, cancelled when the window closes
+        self.active_engine = None
+        # Download workers, kept across queue runs; see _get_download_pool()
+        self.download_pool = None
+        self._pool_workers = 0
+        # Metadata engines by (browser, cookie file); see _metadata_engine()
+        self._metadata_engines = {}
+        # Settings as last loaded; on_close skips the write when nothing changed
+        self._cfg_snapshot = None
+        # Filled from any thread by log(); drained on the Tk thread by _flush_log()
+        self._log_pending = deque()
+        self._log_lines = 0
+        # (completed, failed, total, finished) of the running queue, written by
+        # its worker thread and drawn on the Tk thread by _pump_progress()
+        self._queue_progress = None
+        # Futures submitted by the running queue, cancelled by on_close
+        self._queue_futures = {}
+        self._progress_shown = None
+        try:
+            self.metadata_cache = MetadataCache()
+        except Exception as e:
+            print(f"[WARN] Metadata cache unavailable: {e}")
+            self.metadata_cache = None
         
         # Setup window
         self.protocol("WM_DELETE_WINDOW", self.on_close)
@@ -53,9 +87,11 @@ class YTP3App(ctk.CTk):
         # Build UI
         self.create_sidebar()
         self.create_tabs()
+        self._toggles = {k: getattr(self, f"chk_{k}") for k in self.TOGGLE_KEYS}
         
         # Startup checks
         self.after(100, self.check_first_run)
+        self.after(self.LOG_FLUSH_MS, self._flush_log)
 
     def check_first_run(self):
         """Perform first-run initialization."""
@@ -66,9 +102,28 @@ class YTP3App(ctk.CTk):
         self.run_startup_checks()
 
     def run_startup_checks(self):
-        """Run system diagnostics."""
-        self.caps = self.doctor.run_diagnostics(self.path_entry.get())
-        missing = self.doctor.get_missing_criticals()
+        """Run system diagnostics in the background."""
+        path = self.path_entry.get()
+        
+        def run():
+            # The probes include network and subprocess calls; keep them off the Tk thread
+            caps = self.doctor.run_diagnostics(path)
+            missing = self.doctor.get_missing_criticals()
+            self.after(0, self._apply_diagnostics, caps, missing)
+        
+        self.IMAGE_LOADER.submit(run)
+
+    def _apply_diagnostics(self, caps, missing):
+        """
+        Store a diagnostics report and show its summary.
+        
+        Args:
+            caps (dict): Diagnostic report
+            missing (list): Missing critical dependencies
+        """
+        self.caps = caps
+        # Cached engines hold the previous capabilities report
+        self._metadata_engines.clear()
         
         if missing:
             self.health_btn.configure(text="[!] Check Deps", text_color="red")
@@ -243,11 +298,11 @@ class YTP3App(ctk.CTk):
         self.lbl_queue_count.pack(side="right", padx=10)
         
         # Queue items list
-        self.queue_scroll = ctk.CTkScrollableFrame(
+        self.queue_list = VirtualQueueList(
             self.tab_queue, fg_color="white", corner_radius=0,
             border_width=2, border_color="#808080"
         )
-        self.queue_scroll.pack(fill="both", expand=True, pady=5)
+        self.queue_list.pack(fill="both", expand=True, pady=5)
         
         # Progress tracking
         self.total_prog = RetroProgressBar(self.tab_queue, height=15)
@@ -331,9 +386,46 @@ class YTP3App(ctk.CTk):
         self.log_box.pack(fill="both", expand=True)
 
     def log(self, msg):
-        """Log a message to the log box."""
-        self.log_box.insert("end", f"{msg}\n")
-        self.log_box.see("end")
+        """Queue a message for the log box (safe to call from worker threads)."""
+        self._log_pending.append(msg)
+
+    def _flush_log(self):
+        """Write all queued log messages to the log box in one insert."""
+        pending = self._log_pending
+        lines = [pending.popleft() for _ in range(len(pending))]
+        if lines:
+            text = "\n".join(lines) + "\n"
+            self.log_box.insert("end", text)
+            # Messages may span several lines (e.g. yt-dlp errors)
+            self._log_lines += text.count("\n")
+            if self._log_lines > self.LOG_MAX_LINES:
+                excess = self._log_lines - self.LOG_MAX_LINES
+                self.log_box.delete("1.0", f"{excess + 1}.0")
+                self._log_lines = self.LOG_MAX_LINES
+            self.log_box.see("end")
+        self.after(self.LOG_FLUSH_MS, self._flush_log)
+
+    def _get_download_pool(self, max_workers):
+        """
+        Get the shared download pool, rebuilding it if the worker count changed.
+        
+        Only called from start_download, which is disabled while a queue runs,
+        so the previous pool is idle when it is replaced.
+        
+        Args:
+            max_workers (int): Number of concurrent downloads
+            
+        Returns:
+            ThreadPoolExecutor: Pool to submit downloads to
+        """
+        if self.download_pool is None or self._pool_workers != max_workers:
+            if self.download_pool is not None:
+                self.download_pool.shutdown(wait=False)
+            self.download_pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="ytp3-dl"
+            )
+            self._pool_workers = max_workers
+        return self.download_pool
 
     def update_conc_label(self, val):
         """Update concurrency display label."""
@@ -364,20 +456,33 @@ class YTP3App(ctk.CTk):
         """Open file browser for cookie file."""
         p = ctk.filedialog.askopenfilename()
         if p:
-            try:
-                with open(p, 'r') as f:
-                    header = f.read(50)
-                    if "Netscape" not in header and "# HTTP Cookie File" not in header and not header.startswith("#"):
-                        self.log("[WARN] Warning: This doesn't look like a Netscape cookie file!")
-            except:
-                pass
-            
             self.cookie_entry.delete(0, "end")
             self.cookie_entry.insert(0, p)
+            # The file may sit on a slow or network drive; sniff it off the Tk thread
+            self.IMAGE_LOADER.submit(self._check_cookie_header, p)
+
+    def _check_cookie_header(self, path):
+        """
+        Warn if a cookie file does not start like a Netscape cookie file.
+        
+        Args:
+            path (str): Selected cookie file
+        """
+        try:
+            with open(path, 'r') as f:
+                header = f.read(50)
+        except Exception:
+            return
+        if "Netscape" not in header and "# HTTP Cookie File" not in header and not header.startswith("#"):
+            self.log("[WARN] Warning: This doesn't look like a Netscape cookie file!")
 
     def show_health(self):
         """Show system health status dialog."""
-        msg = f"FFmpeg: {self.caps['ffmpeg']}\nJS Runtime: {self.caps['js_runtime']}\nInternet: {self.caps['internet']}"
+        # Diagnostics run in the background; caps is empty until they finish
+        caps = self.caps
+        pending = "Checking..."
+        msg = (f"FFmpeg: {caps.get('ffmpeg', pending)}\nJS Runtime: {caps.get('js_runtime', pending)}"
+               f"\nInternet: {caps.get('internet', pending)}")
         dialog = ctk.CTkToplevel(self)
         dialog.geometry("300x200")
         ctk.CTkLabel(dialog, text=msg).pack(pady=20)
@@ -385,6 +490,7 @@ class YTP3App(ctk.CTk):
     def load_settings(self):
         """Load settings from configuration."""
         d = self.cfg.load()
+        self._cfg_snapshot = copy.deepcopy(d)
         
         # Paths and basic settings
         self.path_entry.delete(0, "end")
@@ -407,9 +513,7 @@ class YTP3App(ctk.CTk):
         
         # Checkboxes (toggles)
         t = d.get("toggles", {})
-        for c, k in [(self.chk_meta, "meta"), (self.chk_thumb, "thumb"),
-                     (self.chk_subs, "subs"), (self.chk_sponsor, "sponsor"),
-                     (self.chk_geo, "geo"), (self.chk_force_ffmpeg, "force_ffmpeg")]:
+        for k, c in self._toggles.items():
             if t.get(k):
                 c.select()
             else:
@@ -423,8 +527,36 @@ class YTP3App(ctk.CTk):
     def set_all_checks(self, val):
         """Set all queue items to checked/unchecked."""
         for item in self.queue_items:
-            item.var_selected.set(val)
-            item.toggle_selection()
+            if item.is_valid:
+                item.selected = val
+        self.queue_list.refresh()
+
+    def _metadata_engine(self, browser, cookie_file):
+        """
+        Get the engine used for metadata fetches with the given authentication.
+        
+        Engines are kept per authentication setting, so later fetches reuse
+        the request pacing and the strategy that last worked.
+        
+        Args:
+            browser (str): Browser to read cookies from, or "None"
+            cookie_file (str): Cookie file path, or empty
+            
+        Returns:
+            YTP3Engine: Metadata engine
+        """
+        key = (browser, cookie_file)
+        engine = self._metadata_engines.get(key)
+        if engine is None:
+            auth_opts = {}
+            if browser != "None":
+                auth_opts['cookiesfrombrowser'] = (browser, None, None, None)
+            if cookie_file:
+                auth_opts['cookiefile'] = cookie_file
+            engine = self._metadata_engines.setdefault(key, YTP3Engine(
+                auth_opts, self.caps, log_callback=self.log,
+                metadata_cache=self.metadata_cache))
+        return engine
 
     def fetch_metadata(self):
         """Fetch metadata for URL in the input box."""
@@ -433,36 +565,30 @@ class YTP3App(ctk.CTk):
             return
         
         # Clear queue
-        for widget in self.queue_scroll.winfo_children():
-            widget.destroy()
-        self.queue_items.clear()
+        self.queue_items = []
+        self.queue_list.set_entries(self.queue_items)
         
         self.btn_analyze.configure(state="disabled", text="Wait...")
         
         def run():
-            auth_opts = {}
-            if self.browser_var.get() != "None":
-                auth_opts['cookiesfrombrowser'] = (self.browser_var.get(), None, None, None)
-            if self.cookie_entry.get().strip():
-                auth_opts['cookiefile'] = self.cookie_entry.get().strip()
-            
-            engine = YTP3Engine(auth_opts, self.caps, log_callback=self.log)
+            engine = self._metadata_engine(self.browser_var.get(), self.cookie_entry.get().strip())
             try:
                 self.log(f"[INFO] Analyzing: {url}")
                 entries = engine.resolve_metadata(url)
-                self.after(0, lambda: self._populate_queue(entries, engine))
+                self.after(0, lambda: self._populate_queue(entries))
             except Exception as e:
                 self.log(f"[ERROR] Fetch Error: {e}")
-                self.btn_analyze.configure(state="normal", text="Analyze")
+                self.after(0, lambda: self.btn_analyze.configure(state="normal", text="Analyze"))
         
-        threading.Thread(target=run, daemon=True).start()
+        # Pooled worker rather than a new thread per click; Analyze stays
+        # disabled until the result is back, so fetches never overlap
+        self.IMAGE_LOADER.submit(run)
 
-    def _populate_queue(self, entries, engine_ref):
+    def _populate_queue(self, entries):
         """Populate queue with metadata entries."""
-        for idx, entry in enumerate(entries):
-            item = VideoItemRow(self.queue_scroll, entry, idx, engine_ref)
-            item.pack(fill="x", pady=2)
-            self.queue_items.append(item)
+        # Rows are only built for the visible part of the list
+        self.queue_items = [QueueEntry(entry) for entry in entries]
+        self.queue_list.set_entries(self.queue_items)
         
         self.lbl_queue_count.configure(text=f"{len(entries)} Items")
         self.btn_analyze.configure(state="normal", text="Analyze")
@@ -471,7 +597,7 @@ class YTP3App(ctk.CTk):
     def start_download(self):
         """Start downloading selected queue items."""
         # Filter out invalid items (missing URLs) and log them
-        all_selected = [i for i in self.queue_items if i.var_selected.get()]
+        all_selected = [i for i in self.queue_items if i.selected]
         selected_items = [i for i in all_selected if i.is_valid]
         
         if not selected_items:
@@ -497,7 +623,7 @@ class YTP3App(ctk.CTk):
             'geo_bypass': self.chk_geo.get(),
             'format_quality': quality,  # Pass quality to engine
             'prefer_ffmpeg': True,
-            'postprocessor_args': ['-c:v', 'copy', '-c:a', 'aac', '-loglevel', 'verbose'],
+            'postprocessor_args': {'merger': ['-c:v', 'copy', '-c:a', 'aac', '-loglevel', 'verbose']},
             'progress_hooks': [],
             'logger': None,
         }
@@ -524,7 +650,7 @@ class YTP3App(ctk.CTk):
                     'preferredquality': '192' if fmt.lower() in ['mp3', 'vorbis', 'opus', 'aac'] else 'best',
                     'nopostoverwrites': False,
                 }],
-                'postprocessor_args': ['-q:a', '0', '-threads', '4'],
+                'postprocessor_args': {'extractaudio': ['-q:a', '0', '-threads', '4']},
                 'keep_video': False,
             })
             self.log("[AUDIO] Audio-only mode enabled with enhanced codec support")
@@ -578,62 +704,105 @@ class YTP3App(ctk.CTk):
             })
         
         max_workers = int(self.conc_slider.get())
+        executor = self._get_download_pool(max_workers)
+        total = len(selected_items)
+        
+        # Workers only record totals; the Tk thread draws them at a fixed rate
+        self._queue_progress = (0, 0, total, False)
+        self._progress_shown = (0, 0)
+        self.after(self.PROGRESS_PUMP_MS, self._pump_progress)
         
         def run_queue():
-            engine = YTP3Engine(opts, self.caps, log_callback=self.log)
+            engine = YTP3Engine(opts, self.caps, log_callback=self.log,
+                                metadata_cache=self.metadata_cache)
+            self.active_engine = engine
             
             self.log(f"[QUEUE] Starting download of {len(selected_items)} item(s) with {max_workers} worker(s)")
             self.log("")
             
-            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-                futures = {}
-                for idx, item in enumerate(selected_items, 1):
-                    item.update_status(0, "Queued...")
-                    url = item.url
-                    title = item.info.get('title', 'Unknown')
-                    
-                    self.log(f"[QUEUE {idx}/{len(selected_items)}] Queuing: {title[:60]}")
-                    
-                    future = executor.submit(engine.download_single_item, url, item.update_status)
-                    futures[future] = (item, title)
-                    time.sleep(random.randint(2, 4))
-                
-                self.log("")
-                completed = 0
-                failed = 0
-                
-                for future in concurrent.futures.as_completed(futures):
-                    item, title = futures[future]
+            for item in selected_items:
+                item.update_status(0, "Queued...")
+            
+            # Keep a bounded window of submitted items and top it up as
+            # downloads finish, instead of submitting the whole queue
+            pending = iter(enumerate(selected_items, 1))
+            in_flight = self._queue_futures = {}
+            
+            def submit_next():
+                nxt = next(pending, None)
+                if nxt is None:
+                    return
+                idx, item = nxt
+                title = item.info.get('title', 'Unknown')[:60]
+                self.log(f"[QUEUE {idx}/{total}] Queuing: {title}")
+                future = executor.submit(engine.download_single_item, item.url, item.update_status)
+                in_flight[future] = (item, title)
+            
+            for _ in range(2 * max_workers):
+                submit_next()
+            
+            self.log("")
+            completed = 0
+            failed = 0
+            
+            while in_flight:
+                done, _ = concurrent.futures.wait(
+                    in_flight, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    item, title = in_flight.pop(future)
                     try:
                         future.result()
                         item.update_status(100, "Done")
-                        self.log(f"[SUCCESS] ✓ {title[:60]}")
+                        self.log(f"[SUCCESS] ✓ {title}")
                         completed += 1
                     except Exception as e:
                         item.update_status(0, "Failed")
                         failed += 1
-                        error_msg = str(e)[:100]
-                        self.log(f"[FAILED] ✗ {title[:60]}")
-                        self.log(f"         Error: {error_msg}")
+                        self.log(f"[FAILED] ✗ {title}")
+                        self.log(f"         Error: {str(e)[:100]}")
                         
                         # Show detailed error if available from engine
-                        if hasattr(engine, 'last_detailed_error') and engine.last_detailed_error:
-                            self.log(f"         Details: {engine.last_detailed_error[:150]}")
+                        details = engine.last_detailed_error
+                        if details:
+                            self.log(f"         Details: {details[:150]}")
                     
-                    prog_val = (completed + failed) / len(selected_items)
-                    self.total_prog.set(prog_val)
-                    self.total_status.configure(text=f"{completed} OK | {failed} Failed | {len(selected_items) - completed - failed} Pending")
+                    submit_next()
+                
+                self._queue_progress = (completed, failed, total, False)
             
             self.log("")
             self.log(f"[COMPLETE] Queue finished: {completed} successful, {failed} failed")
+            self._queue_progress = (completed, failed, total, True)
+        
+        threading.Thread(target=run_queue, daemon=True).start()
+
+    def _pump_progress(self):
+        """Draw the running queue's totals; re-arms itself until the queue finishes."""
+        completed, failed, total, finished = self._queue_progress
+        if (completed, failed) != self._progress_shown:
+            self._progress_shown = (completed, failed)
+            self.total_prog.set((completed + failed) / total)
+            self.total_status.configure(text=f"{completed} OK | {failed} Failed | {total - completed - failed} Pending")
+        
+        if finished:
             self.total_prog.stop_animation()
             self.total_prog.set(1.0)
             self.btn_start.configure(state="normal", text="START")
-        
-        threading.Thread(target=run_queue, daemon=True).start()
+        else:
+            self.after(self.PROGRESS_PUMP_MS, self._pump_progress)
 
     def on_close(self):
         """Handle window close event."""
+        # Stop running downloads instead of waiting out their retries
+        if self.active_engine is not None:
+            self.active_engine.cancel()
+        if self.download_pool is not None:
+            # Cancelled by hand: shutdown(cancel_futures=) needs Python 3.9
+            for future in list(self._queue_futures):
+                future.cancel()
+            self.download_pool.shutdown(wait=False)
+        
         # Save basic settings
         self.cfg.data["save_path"] = self.path_entry.get()
         self.cfg.data["concurrency"] = int(self.conc_slider.get())
@@ -649,21 +818,16 @@ class YTP3App(ctk.CTk):
         self.cfg.data["quality"] = self.quality_var.get()
         
         # Save toggle settings
-        toggles = {
-            "meta": self.chk_meta.get(),
-            "thumb": self.chk_thumb.get(),
-            "subs": self.chk_subs.get(),
-            "sponsor": self.chk_sponsor.get(),
-            "geo": self.chk_geo.get(),
-            "force_ffmpeg": self.chk_force_ffmpeg.get(),
-        }
-        self.cfg.data["toggles"] = toggles
+        self.cfg.data["toggles"] = {k: c.get() for k, c in self._toggles.items()}
         
         # Save authentication settings
         self.cfg.data["browser_cookies"] = self.browser_var.get()
         self.cfg.data["cookie_file"] = self.cookie_entry.get()
         
-        self.cfg.save()
+        # Unchanged settings are not rewritten; changed ones are saved before
+        # teardown so exiting cannot cut the write short
+        if self.cfg.data != self._cfg_snapshot:
+            self.cfg.save()
         self.destroy()
 
 
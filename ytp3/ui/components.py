@@ -1,15 +1,100 @@
 """UI Components for the GUI application."""
 
+import os
+import sys
+import hashlib
 import colorsys
+import threading
 from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
 
 try:
     import customtkinter as ctk
     from PIL import Image
     import requests
+    from requests.adapters import HTTPAdapter
 except ImportError:
     raise ImportError("customtkinter, pillow, and requests required")
 
+from ytp3.core.cache import default_cache_dir
+
+
+# Thumbnails are fetched in parallel over kept-alive connections
+_THUMB_SESSION = requests.Session()
+_THUMB_SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=32))
+_THUMB_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="ytp3-thumb")
+THUMB_SIZE = (80, 45)
+
+# Shrunk thumbnails are kept on disk across sessions, least recently used pruned
+THUMB_CACHE_DIR = os.path.join(default_cache_dir(), "thumbs")
+THUMB_CACHE_ENTRIES = 500
+_thumb_cache_pruned = threading.Event()
+
+
+def _thumb_cache_path(url):
+    """Get the cache file for a thumbnail URL."""
+    key = hashlib.blake2b(url.encode("utf-8"), digest_size=16).hexdigest()
+    return os.path.join(THUMB_CACHE_DIR, key + ".webp")
+
+
+def _prune_thumb_cache():
+    """Delete the least recently used cached thumbnails beyond THUMB_CACHE_ENTRIES."""
+    try:
+        files = [e for e in os.scandir(THUMB_CACHE_DIR) if e.is_file()]
+        files.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+        for e in files[THUMB_CACHE_ENTRIES:]:
+            os.remove(e.path)
+    except OSError:
+        pass
+
+
+def _fetch_thumbnail(url):
+    """
+    Load a thumbnail from the disk cache, or download and shrink it
+    (runs on the thumbnail pool).
+    
+    Args:
+        url (str): Thumbnail URL
+        
+    Returns:
+        PIL.Image.Image: Image scaled to fit THUMB_SIZE
+    """
+    path = _thumb_cache_path(url)
+    try:
+        img = Image.open(path)
+        img.load()
+        # mtime doubles as the last-used time for pruning
+        os.utime(path)
+        return img
+    except OSError:
+        pass
+    
+    response = _THUMB_SESSION.get(url, timeout=5)
+    response.raise_for_status()
+    
+    img = Image.open(BytesIO(response.content))
+    # Let the JPEG decoder downscale while decoding instead of after
+    img.draft("RGB", (THUMB_SIZE[0] * 2, THUMB_SIZE[1] * 2))
+    img.thumbnail(THUMB_SIZE, Image.Resampling.BILINEAR)
+    
+    try:
+        os.makedirs(THUMB_CACHE_DIR, exist_ok=True)
+        img.save(path, "WEBP", quality=70)
+    except Exception:
+        # The cache is optional; the image is still shown
+        pass
+    if not _thumb_cache_pruned.is_set():
+        _thumb_cache_pruned.set()
+        _prune_thumb_cache()
+    return img
+
+
+# One animation cycle of RetroProgressBarAnimated: hue 0..1 in 0.005 steps
+_HUE_CYCLE = tuple(
+    "#%02x%02x%02x" % tuple(int(c * 255) for c in colorsys.hsv_to_rgb(i / 200, 0.8, 0.9))
+    for i in range(200)
+)
+
 
 class RetroProgressBar(ctk.CTkFrame):
     """Modern retro-style progress bar with solid fill and status indicator."""
@@ -96,7 +181,7 @@ class RetroProgressBarAnimated(ctk.CTkProgressBar):
         """Initialize the progress bar."""
         super().__init__(*args, **kwargs)
         self.configure(corner_radius=0, border_width=2, border_color="gray50")
-        self.hue = 0
+        self._hue_idx = 0
         self.running = False
 
     def start_animation(self):
@@ -115,37 +200,85 @@ class RetroProgressBarAnimated(ctk.CTkProgressBar):
         if not self.running:
             return
         
-        self.hue = (self.hue + 0.005) % 1.0
-        rgb = colorsys.hsv_to_rgb(self.hue, 0.8, 0.9)
-        color_hex = "#%02x%02x%02x" % (int(rgb[0]*255), int(rgb[1]*255), int(rgb[2]*255))
-        self.configure(progress_color=color_hex)
+        self._hue_idx = (self._hue_idx + 1) % len(_HUE_CYCLE)
+        self.configure(progress_color=_HUE_CYCLE[self._hue_idx])
         self.after(50, self.animate)
 
 
-class VideoItemRow(ctk.CTkFrame):
-    """UI component for displaying a single video item in the queue."""
+class QueueEntry:
+    """Queue state for one video, kept apart from the row widget that shows it.
+    
+    Rows are recycled as the queue list scrolls, so selection and progress
+    live here and are pushed to whichever row is currently bound.
+    """
+    
+    __slots__ = ("info", "url", "is_valid", "selected", "percent", "status", "row",
+                 "thumb", "thumb_requested")
     
-    def __init__(self, parent, info_dict, idx, engine_ref):
+    def __init__(self, info_dict):
         """
-        Initialize video item row.
+        Initialize queue entry.
         
         Args:
-            parent: Parent widget
             info_dict (dict): Video information dictionary
-            idx (int): Item index
-            engine_ref: Reference to download engine
         """
-        super().__init__(parent, fg_color="#DFDFDF", corner_radius=0, border_width=2, border_color="white")
         self.info = info_dict
         self.url = info_dict.get('url') or info_dict.get('original_url')
-        self.thumb_image = None
         
         # BUG FIX: Flag invalid entries that lack URL
         self.is_valid = bool(self.url)
+        self.selected = True
+        self.percent = 0
+        self.status = "Waiting..."
+        self.row = None
+        self.thumb = None  # CTkImage once loaded
+        self.thumb_requested = False
+
+    def thumbnail_url(self):
+        """Get the URL of the entry's thumbnail, or None."""
+        thumbs = self.info.get('thumbnails')
+        if thumbs:
+            # Get highest quality thumbnail
+            return thumbs[-1].get('url')
+        return self.info.get('thumbnail')
+
+    def update_status(self, percent, msg):
+        """
+        Record download progress and show it if the entry is on screen.
+        
+        Args:
+            percent (float): Progress percentage (0-100)
+            msg (str): Status message
+        """
+        self.percent = percent
+        self.status = msg
+        row = self.row
+        if row is not None:
+            row.request_status()
+
+
+class VideoItemRow(ctk.CTkFrame):
+    """Recyclable row widget displaying one QueueEntry."""
+    
+    # Progress redraws are coalesced to at most one per this many ms
+    STATUS_FLUSH_MS = 50
+    
+    def __init__(self, parent):
+        """
+        Initialize an unbound video item row.
+        
+        Args:
+            parent: Parent widget
+        """
+        super().__init__(parent, fg_color="#DFDFDF", corner_radius=0, border_width=2, border_color="white")
+        self.entry = None
+        self._flush_scheduled = False
+        # What the progress widgets currently show, to skip no-op configures
+        self._shown_bar = 0
+        self._shown_label = ("Waiting...", "#000000")
         
         self.bind("<Button-1>", self.toggle_selection)
         self._create_widgets()
-        self._load_thumbnail()
 
     def _create_widgets(self):
         """Create and layout UI widgets."""
@@ -154,7 +287,8 @@ class VideoItemRow(ctk.CTkFrame):
         self.chk = ctk.CTkCheckBox(
             self, text="", variable=self.var_selected, width=20,
             corner_radius=0, border_width=2, border_color="#808080",
-            fg_color="white", checkmark_color="black", hover_color="#C0C0C0"
+            fg_color="white", checkmark_color="black", hover_color="#C0C0C0",
+            command=self._on_check
         )
         self.chk.grid(row=0, column=0, padx=5, pady=10, rowspan=2, sticky="w")
 
@@ -165,35 +299,20 @@ class VideoItemRow(ctk.CTkFrame):
             corner_radius=0
         )
         self.thumb_lbl.grid(row=0, column=1, padx=5, pady=5, rowspan=2)
-        self.thumb_lbl.bind("<Button-1>", self.toggle_selection)
 
         # Title label
-        title = self.info.get('title', 'Unknown Title')
-        if len(title) > 55:
-            title = title[:52] + "..."
-        
-        # Add visual indicator for invalid items
-        if not self.is_valid:
-            title = title + " [INVALID URL]"
-            title_color = "#808080"
-        else:
-            title_color = "black"
-            
         self.title_lbl = ctk.CTkLabel(
-            self, text=title, font=("Arial", 11, "bold"),
-            text_color=title_color, anchor="w"
+            self, text="", font=("Arial", 11, "bold"),
+            text_color="black", anchor="w"
         )
         self.title_lbl.grid(row=0, column=2, padx=5, pady=(5, 0), sticky="ew")
-        self.title_lbl.bind("<Button-1>", self.toggle_selection)
 
         # Duration label
-        duration = self.info.get('duration_string') or "?"
         self.meta_lbl = ctk.CTkLabel(
-            self, text=f"Time: {duration}", font=("Arial", 10),
+            self, text="", font=("Arial", 10),
             text_color="#404040", anchor="w"
         )
         self.meta_lbl.grid(row=1, column=2, padx=5, pady=(0, 5), sticky="ew")
-        self.meta_lbl.bind("<Button-1>", self.toggle_selection)
 
         # Progress bar
         self.prog_bar = ctk.CTkProgressBar(
@@ -211,109 +330,254 @@ class VideoItemRow(ctk.CTkFrame):
         self.status_lbl.grid(row=1, column=3, padx=5, pady=(0, 5), sticky="e")
 
         self.grid_columnconfigure(2, weight=1)
+        
+        # Clicks on the labels toggle selection through one shared bind tag,
+        # rather than a binding on each label's inner canvas and text widget
+        click_tag = f"vrow{id(self)}"
+        self.bind_class(click_tag, "<Button-1>", self.toggle_selection)
+        for lbl in (self.thumb_lbl, self.title_lbl, self.meta_lbl):
+            for part in lbl.winfo_children():
+                part.bindtags(part.bindtags() + (click_tag,))
+
+    def bind_entry(self, entry):
+        """
+        Show a queue entry in this row, detaching the previous one.
+        
+        Args:
+            entry (QueueEntry): Entry to display
+        """
+        if entry is self.entry:
+            return
+        if self.entry is not None and self.entry.row is self:
+            self.entry.row = None
+        self.entry = entry
+        entry.row = self
+        
+        title = entry.info.get('title', 'Unknown Title')
+        if len(title) > 55:
+            title = title[:52] + "..."
+        
+        # Add visual indicator for invalid items
+        if not entry.is_valid:
+            title = title + " [INVALID URL]"
+            title_color = "#808080"
+        else:
+            title_color = "black"
+        self.title_lbl.configure(text=title, text_color=title_color)
+        
+        duration = entry.info.get('duration_string') or "?"
+        self.meta_lbl.configure(text=f"Time: {duration}")
+        
+        self._show_selection()
+        self._load_thumbnail()
+        self.show_status(entry)
+
+    def unbind_entry(self):
+        """Detach the displayed entry so its updates stop reaching this row."""
+        if self.entry is not None and self.entry.row is self:
+            self.entry.row = None
+        self.entry = None
+
+    def _show_selection(self):
+        """Sync the checkbox and background with the entry's selection."""
+        selected = self.entry.selected
+        self.var_selected.set(selected)
+        self.configure(fg_color="#FFFFFF" if selected else "#DFDFDF")
+
+    def _on_check(self):
+        """Store a checkbox click on the entry."""
+        if self.entry is None:
+            return
+        if not self.entry.is_valid:
+            self.var_selected.set(self.entry.selected)
+            return
+        self.entry.selected = self.var_selected.get()
+        self._show_selection()
 
     def toggle_selection(self, event=None):
         """Toggle the selection state of this item."""
         # Prevent selection of invalid items (missing URL)
-        if not self.is_valid:
+        if self.entry is None or not self.entry.is_valid:
             return
-            
-        self.var_selected.set(not self.var_selected.get())
-        color = "#FFFFFF" if self.var_selected.get() else "#DFDFDF"
-        self.configure(fg_color=color)
+        
+        self.entry.selected = not self.entry.selected
+        self._show_selection()
 
     def _load_thumbnail(self):
-        """Load and display thumbnail (non-blocking)."""
-        try:
-            thumb_url = None
-            
-            if 'thumbnails' in self.info and self.info['thumbnails']:
-                # Get highest quality thumbnail
-                thumb_url = self.info['thumbnails'][-1].get('url')
-            else:
-                thumb_url = self.info.get('thumbnail')
-            
-            if not thumb_url:
-                return
-            
-            # Load thumbnail
-            response = requests.get(thumb_url, timeout=5)
-            response.raise_for_status()
-            
-            img_data = Image.open(BytesIO(response.content))
-            img_data.thumbnail((80, 45), Image.Resampling.LANCZOS)
-            
-            self.thumb_image = ctk.CTkImage(light_image=img_data, dark_image=img_data, size=(80, 45))
-            self.thumb_lbl.configure(image=self.thumb_image, text="")
-            
-        except Exception as e:
+        """Show the bound entry's thumbnail, fetching it in the background once."""
+        entry = self.entry
+        if entry.thumb is not None:
+            self.thumb_lbl.configure(image=entry.thumb, text="")
+            return
+        
+        self.thumb_lbl.configure(image="", text="[No Thumb]")
+        if entry.thumb_requested:
+            return
+        thumb_url = entry.thumbnail_url()
+        if not thumb_url:
+            return
+        
+        entry.thumb_requested = True
+        future = _THUMB_POOL.submit(_fetch_thumbnail, thumb_url)
+        future.add_done_callback(lambda f: self._thumbnail_done(entry, f))
+
+    def _thumbnail_done(self, entry, future):
+        """Hand a finished thumbnail fetch to the Tk thread."""
+        if future.exception() is not None:
             # Silently fail - thumbnail is optional
+            return
+        try:
+            self.after(0, self._apply_thumbnail, entry, future.result())
+        except Exception:
+            # Window already closed
             pass
 
-    def update_status(self, percent, msg):
+    def _apply_thumbnail(self, entry, img):
+        """Store a fetched thumbnail and show it if the entry is on screen."""
+        entry.thumb = ctk.CTkImage(light_image=img, dark_image=img, size=THUMB_SIZE)
+        # The entry may have scrolled onto another pooled row meanwhile
+        row = entry.row
+        if row is not None:
+            row.thumb_lbl.configure(image=entry.thumb, text="")
+
+    def request_status(self):
+        """Schedule a redraw of the bound entry's progress (any thread)."""
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.after(self.STATUS_FLUSH_MS, self._flush_status)
+
+    def _flush_status(self):
+        """Draw the latest progress of the bound entry."""
+        # Clear first so an update arriving during the redraw schedules another
+        self._flush_scheduled = False
+        if self.entry is not None:
+            self.show_status(self.entry)
+
+    def show_status(self, entry):
         """
-        Update download status and progress.
+        Show an entry's download status and progress.
         
         Args:
-            percent (float): Progress percentage (0-100)
-            msg (str): Status message
+            entry (QueueEntry): Entry whose status changed
         """
-        self.prog_bar.set(percent / 100)
-        self.status_lbl.configure(text=msg)
+        if entry is not self.entry:
+            return
+        percent, msg = entry.percent, entry.status
+        # Skip CTk redraws that would not change a pixel: the bar is ~120 px
+        # wide, so whole percents are as fine as it can show
+        bar = int(percent)
+        if bar != self._shown_bar:
+            self._shown_bar = bar
+            self.prog_bar.set(percent / 100)
         
-        if percent >= 100:
-            self.status_lbl.configure(text="Complete", text_color="green")
-
-
-        self.meta_lbl.grid(row=1, column=2, padx=5, pady=(0, 5), sticky="ew")
-        self.meta_lbl.bind("<Button-1>", self.toggle_selection)
-
-        # Progress bar
-        self.prog_bar = ctk.CTkProgressBar(
-            self, height=10, width=120, progress_color="#000080",
-            fg_color="white", corner_radius=0, border_width=1, border_color="black"
-        )
-        self.prog_bar.set(0)
-        self.prog_bar.grid(row=0, column=3, padx=5, pady=(10, 0), sticky="e")
-
-        # Status label
-        self.status_lbl = ctk.CTkLabel(
-            self, text="Waiting...", font=("Arial", 9),
-            text_color="#000000", width=120, anchor="e"
-        )
-        self.status_lbl.grid(row=1, column=3, padx=5, pady=(0, 5), sticky="e")
+        label = ("Complete", "green") if percent >= 100 else (msg, "#000000")
+        if label != self._shown_label:
+            self._shown_label = label
+            self.status_lbl.configure(text=label[0], text_color=label[1])
 
-        self.grid_columnconfigure(2, weight=1)
-
-    def toggle_selection(self, event=None):
-        """Toggle the selection state of this item."""
-        self.var_selected.set(not self.var_selected.get())
-        color = "#FFFFFF" if self.var_selected.get() else "#DFDFDF"
-        self.configure(fg_color=color)
 
-    def _load_thumbnail(self):
-        """Load and display thumbnail (async)."""
-        thumb_url = None
+class VirtualQueueList(ctk.CTkFrame):
+    """Scrollable queue that only builds widgets for the visible rows.
+    
+    A small pool of VideoItemRow widgets is re-bound to whichever entries
+    intersect the viewport, so the widget count follows the window height
+    rather than the playlist length.
+    """
+    
+    ROW_HEIGHT = 62
+    # Pixels moved per scroll unit (one mouse wheel notch is three units)
+    SCROLL_UNIT = 20
+    
+    def __init__(self, parent, **kwargs):
+        """Initialize an empty queue list."""
+        super().__init__(parent, **kwargs)
+        self.entries = []
+        self.row_pool = []
+        self._top = 0  # Scroll offset in pixels
         
-        if 'thumbnails' in self.info:
-            thumb_url = self.info['thumbnails'][-1].get('url') if self.info['thumbnails'] else None
-        else:
-            thumb_url = self.info.get('thumbnail')
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.yview)
+        self.scrollbar.pack(side="right", fill="y", padx=(0, 2), pady=2)
+        self.canvas = ctk.CTkCanvas(self, bg="white", highlightthickness=0)
+        self.canvas.pack(side="left", fill="both", expand=True, padx=(2, 0), pady=2)
+        self.canvas.bind("<Configure>", lambda e: self._render_visible())
         
-        if thumb_url:
-            # This will be handled by parent widget's executor
-            pass
+        if sys.platform.startswith("linux"):
+            self.bind_all("<Button-4>", self._on_mousewheel, add=True)
+            self.bind_all("<Button-5>", self._on_mousewheel, add=True)
+        else:
+            self.bind_all("<MouseWheel>", self._on_mousewheel, add=True)
 
-    def update_status(self, percent, msg):
+    def set_entries(self, entries):
         """
-        Update download status and progress.
+        Replace the displayed entries and scroll back to the top.
         
         Args:
-            percent (float): Progress percentage (0-100)
-            msg (str): Status message
+            entries (list): QueueEntry objects
         """
-        self.prog_bar.set(percent / 100)
-        self.status_lbl.configure(text=msg)
+        for row in self.row_pool:
+            row.unbind_entry()
+            row.place_forget()
+        self.entries = entries
+        self._top = 0
+        self._render_visible()
+
+    def refresh(self):
+        """Redraw the selection state of the visible rows."""
+        for row in self.row_pool:
+            if row.entry is not None:
+                row._show_selection()
+
+    def yview(self, *args):
+        """
+        Scroll the list (scrollbar command protocol).
         
-        if percent >= 100:
-            self.status_lbl.configure(text="Complete", text_color="green")
+        Args:
+            *args: ('moveto', fraction) or ('scroll', count, 'units'|'pages')
+        """
+        if args[0] == "moveto":
+            self._top = int(float(args[1]) * len(self.entries) * self.ROW_HEIGHT)
+        elif args[0] == "scroll":
+            step = self.canvas.winfo_height() if args[2] == "pages" else self.SCROLL_UNIT
+            self._top += int(args[1]) * step
+        self._render_visible()
+
+    def _on_mousewheel(self, event):
+        """Scroll when the wheel turns over the list or one of its rows."""
+        path, canvas_path = str(event.widget), str(self.canvas)
+        if path != canvas_path and not path.startswith(canvas_path + "."):
+            return
+        if sys.platform.startswith("win"):
+            units = -int(event.delta / 40)
+        elif sys.platform == "darwin":
+            units = -event.delta
+        else:
+            units = -3 if event.num == 4 else 3
+        self.yview("scroll", units, "units")
+
+    def _render_visible(self):
+        """Bind and place pooled rows for the entries inside the viewport."""
+        height = self.canvas.winfo_height()
+        total = len(self.entries) * self.ROW_HEIGHT
+        self._top = max(0, min(self._top, total - height))
+        
+        first = self._top // self.ROW_HEIGHT
+        visible = max(0, min(len(self.entries) - first, height // self.ROW_HEIGHT + 2))
+        while len(self.row_pool) < visible:
+            self.row_pool.append(VideoItemRow(self.canvas))
+        
+        # Row idx % visible keeps its entry while the viewport slides over it,
+        # so scrolling only rebinds the rows that wrap around
+        for idx in range(first, first + visible):
+            row = self.row_pool[idx % visible]
+            row.bind_entry(self.entries[idx])
+            row.place(x=0, y=idx * self.ROW_HEIGHT - self._top,
+                      relwidth=1, height=self.ROW_HEIGHT - 2)
+        for row in self.row_pool[visible:]:
+            if row.entry is not None:
+                row.unbind_entry()
+                row.place_forget()
+        
+        if total > height:
+            self.scrollbar.set(self._top / total, (self._top + height) / total)
+        else:
+            self.scrollbar.set(0, 1)
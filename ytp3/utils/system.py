@@ -1,17 +1,67 @@
 """System utilities: configuration, diagnostics, and path management."""
 
 import os
+import sys
+import copy
 import json
 import platform
 import shutil
+import socket
 import tempfile
+import time
 import traceback
 import datetime
+import functools
+import concurrent.futures
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dumps(data):
+    """Serialize data to JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=4).encode("utf-8")
+
+
+def _loads(buf):
+    """Parse JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(buf)
+    return json.loads(buf)
+
+
+# Raw descriptors on Windows default to text mode, which would translate newlines
+_O_BINARY = getattr(os, "O_BINARY", 0)
+
+
+def _read_fd(fd, size):
+    """Read ``size`` bytes from a raw file descriptor, bypassing io buffering."""
+    buf = os.read(fd, size)
+    while len(buf) < size:
+        chunk = os.read(fd, size - len(buf))
+        if not chunk:
+            break
+        buf += chunk
+    return buf
+
+
+def _write_fd(fd, buf):
+    """Write all of ``buf`` to a raw file descriptor."""
+    view = memoryview(buf)
+    while view:
+        view = view[os.write(fd, view):]
 
 
 class ConfigManager:
     """Manages application configuration and persistence."""
     
+    # Parsed config files shared across instances: abspath -> (mtime_ns, size, data)
+    _cache = {}
+    
     def __init__(self, config_file=None):
         """
         Initialize config manager.
@@ -79,8 +129,7 @@ class ConfigManager:
                 base = os.path.expanduser("~/.config")
             
             path = os.path.join(base, "YTP3Downloader")
-            if not os.path.exists(path):
-                os.makedirs(path)
+            os.makedirs(path, exist_ok=True)
             
             self.config_file = os.path.join(path, "config.json")
         
@@ -93,12 +142,29 @@ class ConfigManager:
         Returns:
             dict: Configuration data
         """
-        if self.config_file and os.path.exists(self.config_file):
-            try:
-                with open(self.config_file, 'r') as f:
-                    self.data.update(json.load(f))
-            except Exception as e:
-                print(f"[WARN] Failed to load config: {e}")
+        if not self.config_file:
+            return self.data
+        
+        try:
+            fd = os.open(self.config_file, os.O_RDONLY | _O_BINARY)
+        except OSError:
+            return self.data
+        
+        try:
+            st = os.fstat(fd)
+            key = os.path.abspath(self.config_file)
+            hit = ConfigManager._cache.get(key)
+            if hit and hit[0] == st.st_mtime_ns and hit[1] == st.st_size:
+                self.data.update(copy.deepcopy(hit[2]))
+                return self.data
+            
+            parsed = _loads(_read_fd(fd, st.st_size))
+            ConfigManager._cache[key] = (st.st_mtime_ns, st.st_size, parsed)
+            self.data.update(copy.deepcopy(parsed))
+        except Exception as e:
+            print(f"[WARN] Failed to load config: {e}")
+        finally:
+            os.close(fd)
         
         return self.data
 
@@ -106,8 +172,18 @@ class ConfigManager:
         """Save configuration to file."""
         if self.config_file:
             try:
-                with open(self.config_file, 'w') as f:
-                    json.dump(self.data, f, indent=4)
+                # Write the whole document at once, then swap it in atomically
+                tmp = self.config_file + ".tmp"
+                fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | _O_BINARY, 0o644)
+                try:
+                    _write_fd(fd, _dumps(self.data))
+                    os.fsync(fd)
+                    st = os.fstat(fd)
+                finally:
+                    os.close(fd)
+                os.replace(tmp, self.config_file)
+                ConfigManager._cache[os.path.abspath(self.config_file)] = (
+                    st.st_mtime_ns, st.st_size, copy.deepcopy(self.data))
             except Exception as e:
                 print(f"[ERROR] Failed to save config: {e}")
 
@@ -115,13 +191,28 @@ class ConfigManager:
 class SystemDoctor:
     """Performs system diagnostics and capability checks."""
     
-    def __init__(self):
-        """Initialize system doctor."""
+    # Seconds a connectivity result is reused by every SystemDoctor
+    INTERNET_TTL = 60
+    _internet_cache = (float("-inf"), False)  # (monotonic time, reachable)
+    # Seconds a report persisted to ``cache_file`` stays valid
+    CACHE_TTL = 3600
+    
+    def __init__(self, cache_file=None):
+        """
+        Initialize system doctor.
+        
+        Args:
+            cache_file (str, optional): JSON file in which reports are persisted
+                                        between runs. Disabled if not provided.
+        """
         self.report = {
             "ffmpeg": False,
             "js_runtime": None,
-            "internet": False
+            "internet": False,
+            "writable": False
         }
+        self.cache_file = cache_file
+        self._cache = {}
         self._inject_local_paths()
 
     def _inject_local_paths(self):
@@ -129,35 +220,128 @@ class SystemDoctor:
         local_bin = os.path.dirname(os.path.abspath(__file__))
         os.environ["PATH"] += os.pathsep + local_bin
 
+    def _check_ffmpeg(self):
+        """Return True if FFmpeg is on PATH."""
+        return shutil.which("ffmpeg") is not None
+
+    def _check_js_runtime(self):
+        """Return the available JavaScript runtime (Deno or Node.js), or None."""
+        if shutil.which("deno"):
+            return "deno"
+        if shutil.which("node"):
+            return "node"
+        return None
+
+    def _check_internet(self):
+        """Return True if a DNS server is reachable over TCP (cached process-wide)."""
+        checked_at, ok = SystemDoctor._internet_cache
+        if time.monotonic() - checked_at < self.INTERNET_TTL:
+            return ok
+        
+        try:
+            with socket.create_connection(("1.1.1.1", 53), timeout=1):
+                ok = True
+        except OSError:
+            ok = False
+        
+        SystemDoctor._internet_cache = (time.monotonic(), ok)
+        return ok
+
+    def _check_writable(self, download_path):
+        """Return True if downloads can be written to ``download_path``."""
+        target = download_path
+        while target and not os.path.exists(target):
+            parent = os.path.dirname(target)
+            if parent == target:
+                break
+            target = parent
+        return bool(target) and os.access(target, os.W_OK)
+
+    def _binaries_fingerprint(self):
+        """Return {name: [path, mtime] or None} for the binaries the report depends on."""
+        fingerprint = {}
+        for name in ("ffmpeg", "deno", "node"):
+            path = shutil.which(name)
+            try:
+                fingerprint[name] = [path, os.path.getmtime(path)] if path else None
+            except OSError:
+                fingerprint[name] = None
+        return fingerprint
+
+    def _load_persisted(self, download_path, fingerprint):
+        """Return the persisted report if it is fresh and matches, else None."""
+        try:
+            with open(self.cache_file, "rb") as f:
+                cached = _loads(f.read())
+        except (OSError, ValueError):
+            return None
+        
+        if (isinstance(cached, dict)
+                and time.time() - cached.get("ts", 0) < self.CACHE_TTL
+                and cached.get("path") == download_path
+                and cached.get("binaries") == fingerprint
+                and isinstance(cached.get("report"), dict)):
+            return cached["report"]
+        return None
+
+    def _persist(self, download_path, fingerprint):
+        """Write the current report to ``cache_file``, ignoring failures."""
+        # Connectivity changes too often to reuse for CACHE_TTL; it is
+        # re-probed on load (under its own, shorter INTERNET_TTL)
+        report = {k: v for k, v in self.report.items() if k != "internet"}
+        entry = {"ts": time.time(), "path": download_path, "binaries": fingerprint, "report": report}
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.cache_file)), exist_ok=True)
+            with open(self.cache_file, "wb") as f:
+                f.write(_dumps(entry))
+        except OSError:
+            pass
+
     def run_diagnostics(self, download_path):
         """
         Run system diagnostics.
         
+        The independent probes run concurrently, and the report is cached
+        per download path for the lifetime of this doctor. With a
+        ``cache_file``, a report is also reused across runs for CACHE_TTL
+        seconds as long as the download path and the FFmpeg, Deno and Node.js
+        binaries are unchanged; connectivity is always re-checked.
+        
         Args:
             download_path (str): Path where downloads will be saved
             
         Returns:
             dict: Diagnostic report
         """
-        # Check for FFmpeg
-        self.report["ffmpeg"] = shutil.which("ffmpeg") is not None
+        cached = self._cache.get(download_path)
+        if cached is not None:
+            self.report = cached
+            return cached
         
-        # Check for JavaScript runtime (Deno or Node.js)
-        if shutil.which("deno"):
-            self.report["js_runtime"] = "deno"
-        elif shutil.which("node"):
-            self.report["js_runtime"] = "node"
-        else:
-            self.report["js_runtime"] = None
+        if self.cache_file:
+            fingerprint = self._binaries_fingerprint()
+            persisted = self._load_persisted(download_path, fingerprint)
+            if persisted is not None:
+                persisted["internet"] = self._check_internet()
+                self.report = self._cache[download_path] = persisted
+                return persisted
         
-        # Check internet connectivity
-        try:
-            import socket
-            socket.create_connection(("8.8.8.8", 53), timeout=2)
-            self.report["internet"] = True
-        except:
-            self.report["internet"] = False
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as pool:
+            ffmpeg = pool.submit(self._check_ffmpeg)
+            js_runtime = pool.submit(self._check_js_runtime)
+            internet = pool.submit(self._check_internet)
+            writable = pool.submit(self._check_writable, download_path)
+            
+            self.report = {
+                "ffmpeg": ffmpeg.result(),
+                "js_runtime": js_runtime.result(),
+                "internet": internet.result(),
+                "writable": writable.result()
+            }
         
+        self._cache[download_path] = self.report
+        if self.cache_file:
+            self._persist(download_path, fingerprint)
         return self.report
 
     def get_missing_criticals(self):
@@ -177,6 +361,19 @@ class SystemDoctor:
         return missing
 
 
+@functools.lru_cache(maxsize=None)
+def _compute_default_path(cwd):
+    """Resolve (and create) the default download directory for ``cwd``."""
+    local = os.path.join(cwd, "downloads")
+    
+    try:
+        os.makedirs(local, exist_ok=True)
+    except OSError:
+        return tempfile.gettempdir()
+    
+    return local
+
+
 class PathManager:
     """Handles path management and creation."""
     
@@ -185,18 +382,13 @@ class PathManager:
         """
         Get default download path.
         
+        The directory is resolved and created once per working directory;
+        later calls return the cached result.
+        
         Returns:
             str: Default download directory path
         """
-        local = os.path.join(os.getcwd(), "downloads")
-        
-        if not os.path.exists(local):
-            try:
-                os.makedirs(local)
-            except:
-                return tempfile.gettempdir()
-        
-        return local
+        return _compute_default_path(os.getcwd())
 
 
 class CrashHandler:
@@ -213,10 +405,22 @@ class CrashHandler:
         ts = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
         filename = f"crash_{ts}.txt"
         
+        tb = traceback.format_exc()
+        
         try:
-            with open(filename, "w") as f:
-                f.write(traceback.format_exc())
+            # Unbuffered write + fsync: nothing is left in a buffer if the
+            # process dies while unwinding
+            fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | _O_BINARY, 0o644)
+            try:
+                _write_fd(fd, tb.encode("utf-8"))
+                os.fsync(fd)
+            finally:
+                os.close(fd)
             print(f"[FATAL] System Crash. Traceback saved to {filename}")
-        except:
+        except Exception:
             print("[FATAL] System Crash. Could not write log file.")
-            traceback.print_exc()
+        
+        # Echo as well, so a copy survives if the log could not be written;
+        # there is no stderr under pythonw or windowed frozen builds
+        if sys.stderr is not None:
+            sys.stderr.write(tb)
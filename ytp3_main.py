@@ -7,19 +7,19 @@ This script handles both GUI and CLI modes.
 
 import sys
 
-from ytp3.cli import main as cli_main
-from ytp3.ui.app import run_gui
 from ytp3.utils.system import CrashHandler
 
 
 def main():
     """Main application entry point."""
     try:
-        # Check for CLI arguments
+        # Each mode imports only its own stack, so CLI runs never load Tk/PIL
         if len(sys.argv) > 1:
+            from ytp3.cli import main as cli_main
             cli_main()
         else:
             # Launch GUI
+            from ytp3.ui.app import run_gui
             run_gui()
     except Exception as e:
         CrashHandler.handle(e)